@@ -1,36 +1,76 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import os
-import base64
 
-# Function to Load Data
-def load_data(file):
-    file_extension = file.name.split('.')[-1].lower()
+from kpitrendx import engine, loader
+from kpitrendx.assets import base64_asset
+from kpitrendx.charts import comparison_figure, distribution_figure, trend_figure
+from kpitrendx.downsample import DEFAULT_CHART_WIDTH_PX, downsample
+from kpitrendx.export import EXPORT_FORMATS, cached_export
+from kpitrendx.fiscal import MONTH_ABBR, DEFAULT_FY_START_MONTH
+from kpitrendx.perf import PipelineTrace, TrackingToken, set_memory_tracking
+from kpitrendx.registry import SessionHandle, shared_registry
+from kpitrendx.table import DEFAULT_PAGE_SIZE, PAGE_SIZES, page_count, paginate, sort_order
+from kpitrendx.streaming import STREAM_THRESHOLD_BYTES, can_stream
 
+# Function to Load Data
+def load_data(file, streaming=False, compact=False):
     try:
-        if file_extension == 'csv':
-            df = pd.read_csv(file)
-        elif file_extension in ['xlsx', 'xls']:
-            df = pd.read_excel(file)
-        elif file_extension == 'json':
-            df = pd.read_json(file)
-        else:
-            st.error("Unsupported file format. Please upload a CSV, Excel, or JSON file.")
-            return None
-    except Exception as e:
-        st.error(f"Error loading file: {e}")
+        return engine.load(file, streaming=streaming, compact=compact)
+    except loader.LoadError as e:
+        st.error(str(e))
         return None
 
-    if 'Date' in df.columns:
-        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-        df.dropna(subset=['Date'], inplace=True)
-        df['Date'] = df['Date'].dt.date
-    else:
-        st.error("Dataset must contain a 'Date' column.")
+# Paged table: sorting, column selection and slicing happen server-side, so only one page is sent to the browser
+def paged_table(dataset, view_key, df, columns, key):
+    col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
+    with col1:
+        shown = st.multiselect("Columns", columns, default=columns, key=f"{key}_columns:" + "|".join(map(str, columns)))
+    with col2:
+        sort_by = st.selectbox("Sort by", [None] + list(columns), format_func=lambda c: "(original order)" if c is None else str(c), key=f"{key}_sort")
+    with col3:
+        ascending = st.selectbox("Order", [True, False], format_func=lambda a: "Ascending" if a else "Descending", key=f"{key}_ascending", disabled=sort_by is None)
+    with col4:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE), key=f"{key}_page_size")
+
+    pages = page_count(len(df), page_size)
+    page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1, key=f"{key}_page_{pages}") if pages > 1 else 1
+    # The sort order is computed once per view and column, then reused for every page
+    order = dataset.derived(("sort_order", view_key, sort_by, ascending), lambda: sort_order(df, sort_by, ascending)) if sort_by is not None else None
+    page_df, total, pages = paginate(df, page, page_size, sort_by, ascending, shown, order)
+    st.dataframe(page_df)
+    first = (page - 1) * page_size
+    st.caption(f"Showing rows {min(first + 1, total):,}–{first + len(page_df):,} of {total:,} (page {page:,} of {pages:,}).")
+    return page_df
+
+# Function to Reopen a Dataset Ingested Earlier, from memory or from the dataset store
+def reopen_data(key):
+    try:
+        return engine.reopen(key)
+    except loader.LoadError as e:
+        st.error(str(e))
         return None
 
-    return df
+# Function to Append Delta Files, in upload order; files that do not fit the dataset are skipped
+def append_data(dataset, files):
+    for file in files:
+        try:
+            dataset = engine.append(dataset, file)
+        except loader.LoadError as e:
+            st.sidebar.error(f"{file.name}: {e}")
+    return dataset
+
+# Download button whose file is built on click and cached per dataset and view
+def export_button(label, dataset, view_key, df, file_stem, key):
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        fmt = st.selectbox("Format", list(EXPORT_FORMATS), format_func=lambda f: EXPORT_FORMATS[f][0], key=f"{key}_format", label_visibility="collapsed")
+    _, extension, mime = EXPORT_FORMATS[fmt]
+    with col2:
+        st.download_button(label=label, data=cached_export(dataset, view_key, df, fmt), file_name=file_stem + extension, mime=mime, key=key)
+
+# Compact by default when KPITRENDX_COMPACT is set to a non-zero value
+COMPACT_BY_DEFAULT = os.environ.get("KPITRENDX_COMPACT", "0") not in ("", "0")
 
 # Set Page Configuration
 st.set_page_config(page_title="KPITrendX: Plug-and-Play Analytics Platform", layout="wide")
@@ -159,71 +199,90 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+# Per-rerun stage timings; peak memory is traced while any session's panel asks for it
+if "perf_tracking_token" not in st.session_state:
+    st.session_state.perf_tracking_token = TrackingToken()
+set_memory_tracking(st.session_state.perf_tracking_token, st.session_state.get("perf_panel", False) and st.session_state.get("perf_track_memory", False))
+trace = PipelineTrace()
+
+# This session's hold on the shared dataset registry, released when the session ends
+if "dataset_handle" not in st.session_state:
+    st.session_state.dataset_handle = SessionHandle(shared_registry)
+
 # Sidebar for File Upload
 st.sidebar.header("📂 Upload Data")
 uploaded_file = st.sidebar.file_uploader("Upload your file (CSV, Excel, JSON)", type=['csv', 'xlsx', 'xls', 'json'])
 
-if uploaded_file is not None:
-    df = load_data(uploaded_file)
-
-    if df is not None:
+# Without an upload, a dataset ingested earlier can be reopened, e.g. to append new days without its history file
+reopen_key = None
+if uploaded_file is None:
+    ingested = dict(engine.ingested())
+    if ingested:
+        reopen_key = st.sidebar.selectbox("🗂️ Or reopen an ingested dataset", [None] + list(ingested), format_func=lambda k: "—" if k is None else f"{ingested[k]} [{k.split(':')[1][:8]}]", key="reopen_key")
+
+if uploaded_file is not None or reopen_key is not None:
+    if uploaded_file is not None:
+        # Large CSV / line-delimited JSON uploads are folded into daily aggregates chunk by chunk
+        streamable = can_stream(uploaded_file, loader.file_format(uploaded_file.name))
+        use_streaming = st.sidebar.checkbox("⚡ Streaming mode (large files)", value=streamable and uploaded_file.size >= STREAM_THRESHOLD_BYTES, disabled=not streamable, help="Aggregates the file chunk by chunk and keeps only a sample of raw rows. Available for CSV and line-delimited JSON files.")
+        compact = st.sidebar.checkbox("🗜️ Compact memory (downcast dtypes)", value=COMPACT_BY_DEFAULT, disabled=use_streaming, help="Stores floats as float32 when no value has more than 6 significant digits, shrinks integers and makes repetitive text columns categorical.")
+    with trace.stage("load_data") as stage:
+        dataset = load_data(uploaded_file, streaming=use_streaming, compact=compact) if uploaded_file is not None else reopen_data(reopen_key)
+        stage.rows_out = dataset.source_rows if dataset is not None else 0
+
+    if dataset is not None:
+        # New days are folded into the loaded dataset instead of re-uploading its history
+        delta_files = st.sidebar.file_uploader("➕ Append new days (same columns)", type=['csv', 'xlsx', 'xls', 'json'], accept_multiple_files=True, key="append_files")
+        if delta_files:
+            with trace.stage("append", rows_in=dataset.source_rows) as stage:
+                dataset = append_data(dataset, delta_files)
+                stage.rows_out = dataset.source_rows
+
+        # One copy per distinct upload is shared by every session; this one works on a read-only view
+        dataset = st.session_state.dataset_handle.hold(dataset)
+
+    if dataset is not None:
+        # Shared across reruns and sessions: derive new frames from df, never mutate it
+        df = dataset.frame
         st.sidebar.header("🎯 Filter Options")
 
-        available_kpis = [col for col in df.columns if col != "Date" and pd.api.types.is_numeric_dtype(df[col])]
+        available_kpis = engine.numeric_kpis(dataset)
 
         if not available_kpis:
             st.sidebar.error("⚠️ No numeric KPIs found in the dataset.")
         else:
             selected_kpis = st.sidebar.multiselect("📊 Select KPIs to visualize", available_kpis, default=[])
 
-            min_date, max_date = df['Date'].min(), df['Date'].max()
+            # Day/week/month sums and counts, computed once per dataset (streamed datasets bring their own)
+            with trace.stage("rollups", rows_in=len(df)) as stage:
+                rollups = engine.rollups(dataset)
+                stage.rows_out = len(rollups["D"])
+
+            if dataset.compaction:
+                st.sidebar.caption(f"Memory: {dataset.compaction['before_bytes'] / 1e6:,.1f} MB → {dataset.compaction['after_bytes'] / 1e6:,.1f} MB after compaction.")
+            if dataset.is_sample:
+                st.sidebar.caption(f"Aggregated {dataset.source_rows:,} rows while streaming; keeping a {len(df):,}-row sample.")
+
+            # First and last days with data
+            min_date, max_date = (day.date() for day in engine.date_bounds(dataset))
             date_range = st.sidebar.date_input("📅 Select Date Range", [min_date, max_date], min_value=min_date, max_value=max_date)
             start_date, end_date = date_range
 
-            df_filtered = df[(df['Date'] >= start_date) & (df['Date'] <= end_date)]
-            df_filtered = df_filtered.groupby('Date').mean(numeric_only=True).reset_index()
-
             st.title("📊 KPITrendX: Plug-and-Play Analytics Platform")
 
             # Time Interval Selection
             st.subheader("📆 Select Time Interval")
-            time_intervals = {"1W": 7, "1M": 30, "3M": 90, "6M": 180, "1Y": 365, "3Y": 1095}
-            selected_interval = st.radio("", list(time_intervals.keys()), horizontal=True)
-            
-            # Filter Data Based on Selected Time Interval
-            days_back = time_intervals[selected_interval]
+            selected_interval = st.radio("", list(engine.INTERVALS), horizontal=True)
             end_date = pd.to_datetime(end_date)
-            start_date = end_date - pd.Timedelta(days=days_back)
-            
-            df_filtered = df[(df['Date'] >= start_date.date()) & (df['Date'] <= end_date.date())]
-            df_filtered = df_filtered.groupby('Date').mean(numeric_only=True).reset_index()
-            
-            import pandas as pd
+            # Everything derived from the view is cached under its full identity, today included
+            view_key = engine.view_key(selected_interval, end_date)
+            today = view_key[3]
 
-            # Ensure 'Date' column is in datetime format
-            df_filtered['Date'] = pd.to_datetime(df_filtered['Date'])
-            
-            if selected_interval == "3M":
-                # Show previous 12 weeks' average values
-                df_filtered = df_filtered.set_index('Date').resample('W').mean().reset_index()  # Weekly data
-                df_filtered = df_filtered.tail(12)  # Show the last 12 weeks
-                
-            elif selected_interval == "6M":
-                # Show week-wise average for the last 6 months
-                df_filtered = df_filtered.set_index('Date').resample('W').mean().reset_index()  # Weekly data
-                df_filtered = df_filtered.tail(26)  # Show the last 26 weeks (6 months)
-                
-            elif selected_interval == "1Y":
-                # Show month-wise average for the last year
-                df_filtered = df_filtered.set_index('Date').resample('M').mean().reset_index()  # Monthly data
-                df_filtered = df_filtered[df_filtered['Date'] >= pd.to_datetime("today") - pd.DateOffset(years=1)]
-                
-            elif selected_interval == "3Y":
-                # Show month-wise average for the last 3 years
-                df_filtered = df_filtered.set_index('Date').resample('M').mean().reset_index()  # Monthly data
-                df_filtered = df_filtered[df_filtered['Date'] >= pd.to_datetime("today") - pd.DateOffset(years=3)]
+            # 1W/1M daily, 3M/6M the last 12/26 weeks, 1Y/3Y the months within one/three years of today
+            with trace.stage("interval_view", rows_in=len(rollups["D"])) as stage:
+                df_filtered = engine.interval_view(dataset, selected_interval, end_date, today)
+                stage.rows_out = len(df_filtered)
 
-            
             # KPI Cards (Dynamic)
             if selected_kpis:
                 st.markdown("<h3>📈 KPI Metrics</h3>", unsafe_allow_html=True)
@@ -249,49 +308,56 @@ if uploaded_file is not None:
 
             with tab1:
                 st.subheader("📈 KPI Trend Over Time")
-                df_melted = df_filtered.melt(id_vars=["Date"], value_vars=selected_kpis, var_name="KPI", value_name="Value")
-
-                fig = px.line(df_melted, x="Date", y="Value", color="KPI", title="KPI Trend Over Time", template="plotly_dark")
-                fig.update_layout(
-                    hovermode="x unified",
-                    margin=dict(l=20, r=20, t=30, b=20),
-                    paper_bgcolor="#222",
-                    plot_bgcolor="#222",
-                    xaxis=dict(showgrid=False),
-                    yaxis=dict(showgrid=False)
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                with trace.stage("melt", rows_in=len(df_filtered)) as stage:
+                    df_melted = df_filtered.melt(id_vars=["Date"], value_vars=selected_kpis, var_name="KPI", value_name="Value")
+                    stage.rows_out = len(df_melted)
+
+                # Cap the points sent to the browser unless the raw series is requested
+                show_raw = st.checkbox("🔍 Show raw data points (for zoomed-in views)", value=False)
+                if not show_raw:
+                    total_points = len(df_melted)
+                    with trace.stage("downsample", rows_in=total_points) as stage:
+                        df_melted = downsample(df_melted, "Date", "Value", max_points=DEFAULT_CHART_WIDTH_PX, by="KPI")
+                        stage.rows_out = len(df_melted)
+                    if len(df_melted) < total_points:
+                        st.caption(f"Showing {len(df_melted):,} of {total_points:,} points (LTTB downsampled).")
+
+                with trace.stage("trend_figure", rows_in=len(df_melted)):
+                    fig = trend_figure(df_melted)
+                    st.plotly_chart(fig, use_container_width=True)
 
                 # KPI Distribution
                 st.subheader("📊 KPI Distribution")
-                fig_dist = px.histogram(df_filtered, x=selected_kpis, title="KPI Distribution", template="plotly_dark", barmode="overlay")
-                st.plotly_chart(fig_dist, use_container_width=True)
+                with trace.stage("histogram", rows_in=len(df_filtered)) as stage:
+                    # Bins are counted server-side and cached per dataset, interval and KPI set
+                    hist_df = engine.distribution(dataset, selected_interval, end_date, selected_kpis, today)
+
+                    fig_dist = distribution_figure(hist_df)
+                    st.plotly_chart(fig_dist, use_container_width=True)
+                    stage.rows_out = len(hist_df)
 
                 # Filtered Data Table
                 st.subheader("📄 Filtered Data")
-                st.dataframe(df_filtered[['Date'] + selected_kpis])
+                with trace.stage("trend_table", rows_in=len(df_filtered)):
+                    paged_table(dataset, view_key, df_filtered, ['Date'] + selected_kpis, key="trend_table")
 
-                # Download Button
-                csv = df_filtered.to_csv(index=False).encode('utf-8')
-                st.download_button(label="⬇️ Download as CSV", data=csv, file_name="KPI_report.csv", mime="text/csv")
+                # Download Button (the file is only built when clicked)
+                export_button("⬇️ Download Report", dataset, view_key, df_filtered, "KPI_report", key="trend_export")
 
             with tab2:
                 st.subheader("📊 Compare KPIs Across Different Time Ranges")
 
                 # KPI Selection
-                comparison_kpi = st.selectbox("Select KPI for Comparison", df.columns[1:])
+                comparison_kpi = st.selectbox("Select KPI for Comparison", available_kpis)
                 
                 st.subheader("📅 Choose Time Range Selection Method")
                 selection_method = st.radio("Select Method", ["Custom Date Range", "Financial Year Dropdown"])
                 
-                # Convert Date column to datetime if not already
-                df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-                
-                # Create Financial Year column
-                df["Financial Year"] = df["Date"].apply(lambda x: f"FY{x.year}-{str(x.year + 1)[-2:]}" if x.month >= 4 else f"FY{x.year - 1}-{str(x.year)[-2:]}")
-                
-                # Get unique financial years for dropdown
-                financial_years = sorted(df["Financial Year"].unique())
+                fy_start_month = MONTH_ABBR.index(st.selectbox("Financial Year Starts In", MONTH_ABBR, index=DEFAULT_FY_START_MONTH - 1)) + 1
+
+                # Financial Year and Month labels of every day in the daily rollup, computed once per dataset and FY start
+                with trace.stage("fiscal_calendar", rows_in=len(rollups["D"])):
+                    financial_years = engine.financial_years(dataset, fy_start_month)
                 
                 # **Option 1: Select Custom Date Ranges**
                 if selection_method == "Custom Date Range":
@@ -299,20 +365,20 @@ if uploaded_file is not None:
                     
                     # Initialize session state for dynamic time ranges
                     if "time_ranges" not in st.session_state:
-                        st.session_state.time_ranges = [(df['Date'].min(), df['Date'].max())]  # Default single range
+                        st.session_state.time_ranges = [(min_date, max_date)]  # Default single range
                     
                     # Add button to dynamically add time ranges
                     if st.button("➕ Add Time Range"):
-                        st.session_state.time_ranges.append((df['Date'].min(), df['Date'].max()))
+                        st.session_state.time_ranges.append((min_date, max_date))
                     
                     # Display time range selectors with delete option
                     for i, (start, end) in enumerate(st.session_state.time_ranges):
                         st.markdown(f"🔹 Time Range {i + 1}")
                         col1, col2, col3 = st.columns(3)
                         with col1:
-                            start_date = st.date_input(f"Start Date {i + 1}", value=start, min_value=df['Date'].min(), max_value=df['Date'].max(), key=f"start_{i}")
+                            start_date = st.date_input(f"Start Date {i + 1}", value=start, min_value=min_date, max_value=max_date, key=f"start_{i}")
                         with col2:
-                            end_date = st.date_input(f"End Date {i + 1}", value=end, min_value=start_date, max_value=df['Date'].max(), key=f"end_{i}")
+                            end_date = st.date_input(f"End Date {i + 1}", value=end, min_value=start_date, max_value=max_date, key=f"end_{i}")
                         with col3:
                             if st.button(f"❌ Remove Time Range {i + 1}", key=f"remove_{i}"):
                                 st.session_state.time_ranges.pop(i)
@@ -321,21 +387,11 @@ if uploaded_file is not None:
                         # Update session state
                         st.session_state.time_ranges[i] = (start_date, end_date)
                 
-                    # Process selected time ranges
-                    comparison_data = []
-                    for i, (start_date, end_date) in enumerate(st.session_state.time_ranges):
-                        if start_date and end_date:
-                            # Convert start_date and end_date to datetime64[ns]
-                            start_date = pd.to_datetime(start_date)
-                            end_date = pd.to_datetime(end_date)
-                    
-                            temp_df = df[(df['Date'] >= start_date) & (df['Date'] <= end_date)].copy()
-
-                        temp_df.loc[:, "Month"] = temp_df["Date"].dt.strftime('%b')
-                
-                        grouped_df = temp_df.groupby(["Financial Year", "Month"])[comparison_kpi].mean().reset_index()
-                        grouped_df["Time Range"] = f"Range {i + 1}: {start_date} to {end_date}"
-                        comparison_data.append(grouped_df)
+                    # Compare all selected time ranges in a single pass
+                    with trace.stage("compare_ranges", rows_in=len(rollups["D"])) as stage:
+                        final_df = engine.compare_ranges(dataset, comparison_kpi, st.session_state.time_ranges, fy_start_month)
+                        stage.rows_out = len(final_df)
+                    comparison_key = ("ranges", comparison_kpi, fy_start_month, tuple(st.session_state.time_ranges))
                 
                 # **Option 2: Select Financial Year from Dropdown**
                 else:
@@ -343,75 +399,53 @@ if uploaded_file is not None:
                     
                     selected_fy = st.multiselect("Choose Financial Years", financial_years)
                     
-                    # Process selected financial years
-                    comparison_data = []
-                    for i, fy in enumerate(selected_fy):
-                        temp_df = df[df["Financial Year"] == fy].copy()
-                        temp_df.loc[:, "Month"] = temp_df["Date"].dt.strftime('%b')
-                
-                        grouped_df = temp_df.groupby(["Financial Year", "Month"])[comparison_kpi].mean().reset_index()
-                        grouped_df["Time Range"] = f"Selected: {fy}"
-                        comparison_data.append(grouped_df)
-                
-                # Merge data for visualization
-                if comparison_data:
-                    final_df = pd.concat(comparison_data)
-                
-                    # Define month order for fiscal year sorting (April to March)
-                    month_order = ["Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec", "Jan", "Feb", "Mar"]
-                
-                    # Ensure 'Month' is categorical with the correct order
-                    final_df["Month"] = pd.Categorical(final_df["Month"], categories=month_order, ordered=True)
+                    # Compare selected financial years in a single pass
+                    with trace.stage("compare_fiscal_years", rows_in=len(rollups["D"])) as stage:
+                        final_df = engine.compare_fiscal_years(dataset, comparison_kpi, selected_fy, fy_start_month)
+                        stage.rows_out = len(final_df)
+                    comparison_key = ("fiscal_years", comparison_kpi, fy_start_month, tuple(selected_fy))
                 
-                    # Sort the DataFrame by Financial Year and Month
-                    final_df = final_df.sort_values(["Financial Year", "Month"])
-                
-                    # Plot comparison chart with sorted x-axis
-                    fig_comp = px.line(final_df, 
-                                       x="Month", 
-                                       y=comparison_kpi, 
-                                       color="Financial Year",
-                                       title="KPI Comparison Across Financial Years",
-                                       template="plotly_dark", 
-                                       markers=True)
-
-                    # Add hover lines
-                    fig_comp.update_traces(mode='lines+markers', hovertemplate='Month: %{x}<br>KPI: %{y}<extra></extra>')
-                    fig_comp.update_layout(hovermode="x unified")  # Adds the vertical hover line
-            
-                    st.plotly_chart(fig_comp, use_container_width=True)
+                # Visualize once there is data to compare
+                if not final_df.empty:
+                    with trace.stage("comparison_figure", rows_in=len(final_df)):
+                        # Plot comparison chart with sorted x-axis
+                        fig_comp = comparison_figure(final_df, comparison_kpi)
+
+                        st.plotly_chart(fig_comp, use_container_width=True)
+
             
                     # Show Data Table
                     st.subheader("📄 Comparison Data Table (FY as Columns, Months as Rows)")
 
-                    # Pivot DataFrame: Months as Index, Financial Years as Columns
-                    pivot_df = final_df.pivot(index="Month", columns="Financial Year", values=comparison_kpi)
-                    
-                    # Reset index to keep Month as a column
-                    pivot_df = pivot_df.reset_index()
+                    with trace.stage("comparison_table", rows_in=len(final_df)) as stage:
+                        # Pivot DataFrame: Months as Index, Financial Years as Columns
+                        pivot_df = engine.comparison_pivot(final_df, comparison_kpi)
                     
-                    # Display in Streamlit
-                    st.dataframe(pivot_df)
+                        # Display in Streamlit
+                        paged_table(dataset, comparison_key + ("pivot",), pivot_df, list(pivot_df.columns), key="comparison_table")
 
-            
-                    # Download Button
-                    csv_comp = final_df.to_csv(index=False).encode('utf-8')
-                    st.download_button(label="⬇️ Download Comparison Data", data=csv_comp, file_name="KPI_Comparison.csv", mime="text/csv")
+                        stage.rows_out = len(pivot_df)
+
+                    # Download Button (the file is only built when clicked)
+                    export_button("⬇️ Download Comparison Data", dataset, comparison_key, final_df, "KPI_Comparison", key="comparison_export")
                     
 else:
-    logo_path = "media/Test.mp4"
+    # Nothing uploaded or reopened: let the registry evict this session's last dataset once idle
+    st.session_state.dataset_handle.release()
 
-    def get_video_base64(video_path):
-        """Reads a video file and encodes it in base64 format."""
-        with open(video_path, "rb") as video_file:
-            base64_video = base64.b64encode(video_file.read()).decode("utf-8")
-        return base64_video
+    # Streamlit serves ./static next to this script at app/static/<name>
+    logo_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "Test.mp4")
     
     if os.path.exists(logo_path):
-        video_base64 = get_video_base64(logo_path)
+        if st.get_option("server.enableStaticServing"):
+            # Browsers cache the file and stream it with range requests
+            video_src = "app/static/Test.mp4"
+        else:
+            # Fall back to inlining, encoded once per process rather than on every rerun
+            video_src = f"data:video/mp4;base64,{base64_asset(logo_path)}"
         video_html = f"""
             <video width="100%" autoplay loop muted>
-                <source src="data:video/mp4;base64,{video_base64}" type="video/mp4">
+                <source src="{video_src}" type="video/mp4">
                 Your browser does not support the video tag.
             </video>
         """
@@ -471,5 +505,16 @@ else:
 
 
 
+# Performance Panel: stage timings of this rerun, also logged as one JSON line
+trace.finish()
+if st.sidebar.checkbox("⏱️ Show performance panel", key="perf_panel"):
+    with st.sidebar.expander("⏱️ Performance", expanded=True):
+        st.checkbox("Track process-wide peak memory (applies from the next rerun)", key="perf_track_memory")
+        st.caption(f"Total script time: {trace.total_seconds * 1000:,.1f} ms")
+        registry_stats = shared_registry.stats()
+        st.caption(f"Shared datasets: {registry_stats['datasets']} ({registry_stats['in_use']} in use by {registry_stats['references']} sessions), {registry_stats['bytes'] / 1e6:,.1f} MB" + (f" of {registry_stats['max_bytes'] / 1e6:,.0f} MB" if registry_stats['max_bytes'] else ""))
+        st.dataframe(trace.to_frame(), hide_index=True)
+        st.download_button("⬇️ Download metrics (JSON)", data=trace.to_json(), file_name="KPI_perf.json", mime="application/json")
+
 st.markdown("---")
 st.markdown("#### 🛠️ Created by Team ENOC", unsafe_allow_html=True)
@@ -0,0 +1 @@
+"""Reproducible benchmarks for the KPITrendX analytics core."""
@@ -0,0 +1,188 @@
+"""Headless benchmark of the KPITrendX analytics core on synthetic datasets.
+
+Usage:
+    python -m benchmarks.run --scale tiny --scale small --output baseline.json
+    python -m benchmarks.run --scale tiny --compare baseline.json
+
+Every operation is timed as the best of --repeat runs with memory tracing off,
+then run once more under tracemalloc to record its peak allocation. With
+--compare, operations slower than the baseline by more than --tolerance are
+reported and the exit status is 1.
+"""
+import argparse
+import datetime as dt
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from kpitrendx import loader
+from kpitrendx.engine import INTERVALS
+from kpitrendx.cache import LRUCache
+from kpitrendx.registry import DatasetRegistry
+from kpitrendx.compare import compare_fiscal_years, compare_ranges, comparison_pivot
+from kpitrendx.export import EXPORT_FORMATS, export_bytes
+from kpitrendx.fiscal import fiscal_calendar
+from kpitrendx.rollup import build_rollups, interval_view
+from kpitrendx.store import ColumnarStore
+from kpitrendx.streaming import stream_aggregate
+
+from . import synthetic
+
+# Excel files are slow to write and capped at 1,048,576 rows per sheet
+DEFAULT_MAX_EXCEL_ROWS = 100_000
+
+
+def measure(fn, repeat):
+    """Best wall time over repeat runs, the peak traced allocation of one more run,
+    and the result of the last run."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        result = fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak, result
+
+
+def bench_scale(name, rows, kpis, formats, repeat, workdir, max_excel_rows, log):
+    results = []
+
+    def record(operation, fn, rows_in=rows):
+        seconds, peak, result = measure(fn, repeat)
+        results.append({"scale": name, "rows": rows, "kpis": kpis, "operation": operation,
+                        "rows_in": rows_in, "seconds": round(seconds, 6), "peak_bytes": peak})
+        log(f"  {operation:<28} {seconds * 1000:>10.1f} ms {peak / 1e6:>10.1f} MB")
+        return result
+
+    paths = {}
+    for fmt in formats:
+        if fmt == "xlsx" and rows > max_excel_rows:
+            log(f"  skipping xlsx: {rows:,} rows exceeds --max-excel-rows")
+            continue
+        paths[fmt] = os.path.join(workdir, f"{name}.{fmt}")
+        synthetic.write(paths[fmt], fmt, rows, kpis)
+
+    dataset = None
+    no_store = ColumnarStore("")
+    for fmt, path in paths.items():
+        if fmt == "jsonl":
+            continue
+        with open(path, "rb") as source:
+            data = source.read()
+        # A fresh cache and registry per run so every run really parses the file
+        dataset = record(f"load[{fmt}]", lambda: loader.load_bytes(data, fmt, cache=LRUCache(0), store=no_store,
+                                                                   registry=DatasetRegistry(0)))
+
+    if dataset is None:
+        raise SystemExit("No loadable format was benchmarked; include csv, json or xlsx.")
+    df = dataset.frame
+    available_kpis = [col for col in df.columns if col != "Date" and pd.api.types.is_numeric_dtype(df[col])]
+
+    store = ColumnarStore(os.path.join(workdir, "store"))
+    record("store_write", lambda: store.write(dataset.key, df))
+    record("store_reload[mmap]", lambda: store.read(dataset.key))
+
+    if "csv" in paths:
+        record("stream[csv]", lambda: stream_aggregate(paths["csv"], "csv"))
+    if "jsonl" in paths:
+        record("stream[jsonl]", lambda: stream_aggregate(paths["jsonl"], "json"))
+
+    rollups = record("rollups", lambda: build_rollups(df, available_kpis))
+    end = rollups["D"].index[-1]
+    # Timed below the engine's memoisation so every repeat does the work
+    for label, (days_back, freq) in INTERVALS.items():
+        record(f"interval_view[{label}]", lambda: interval_view(rollups, end - pd.Timedelta(days=days_back), end, freq),
+               rows_in=len(rollups["D"]))
+
+    calendar = record("fiscal_calendar[daily]", lambda: fiscal_calendar(rollups["D"].index), rows_in=len(rollups["D"]))
+    record("fiscal_calendar[rows]", lambda: fiscal_calendar(df["Date"]))
+
+    kpi = available_kpis[0]
+    first = rollups["D"].index[0]
+    span = (end - first) / 10
+    ranges = [((first + i * span).date(), (first + (i + 3) * span).date()) for i in range(10)]
+    final_df = record("compare_ranges[10]", lambda: compare_ranges(rollups, calendar, kpi, ranges), rows_in=len(rollups["D"]))
+    years = list(calendar["Financial Year"].cat.categories)
+    record("compare_fiscal_years", lambda: compare_fiscal_years(rollups, calendar, kpi, years), rows_in=len(rollups["D"]))
+    record("comparison_pivot", lambda: comparison_pivot(final_df, kpi),
+           rows_in=len(final_df))
+
+    daily_view = interval_view(rollups, first, end, "D")
+    for fmt in EXPORT_FORMATS:
+        record(f"export[{fmt}]", lambda: export_bytes(daily_view, fmt), rows_in=len(daily_view))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Returns messages for operations slower than the baseline by more than tolerance."""
+    previous = {(r["scale"], r["operation"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get((result["scale"], result["operation"]))
+        if before and result["seconds"] > before["seconds"] * (1 + tolerance):
+            regressions.append(
+                f"{result['scale']} {result['operation']}: {before['seconds'] * 1000:.1f} ms -> {result['seconds'] * 1000:.1f} ms"
+            )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", action="append", help="preset (%s) or ROWSxKPIS; repeatable" % ", ".join(synthetic.SCALES))
+    parser.add_argument("--format", action="append", choices=["csv", "json", "jsonl", "xlsx"], help="input formats to load; repeatable")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-excel-rows", type=int, default=DEFAULT_MAX_EXCEL_ROWS)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="baseline JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, as a fraction")
+    args = parser.parse_args(argv)
+
+    scales = [synthetic.parse_scale(spec) for spec in (args.scale or ["tiny"])]
+    formats = args.format or ["csv", "json", "xlsx"]
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="kpitrendx-bench-") as workdir:
+        for name, rows, kpis in scales:
+            print(f"{name}: {rows:,} rows x {kpis} KPIs", flush=True)
+            results += bench_scale(name, rows, kpis, formats, args.repeat, workdir, args.max_excel_rows,
+                                   lambda line: print(line, flush=True))
+
+    report = {
+        "meta": {
+            "created_at": dt.datetime.now(dt.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as out:
+        json.dump(report, out, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        for line in regressions:
+            print("REGRESSION", line)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
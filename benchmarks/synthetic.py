@@ -0,0 +1,74 @@
+"""Synthetic KPI datasets with duplicated dates, missing days and missing values."""
+import numpy as np
+import pandas as pd
+
+# Preset scales: name -> (rows, KPI columns)
+SCALES = {
+    "tiny": (10_000, 5),
+    "small": (100_000, 20),
+    "medium": (1_000_000, 50),
+    "wide": (100_000, 500),
+    "large": (10_000_000, 100),
+}
+
+
+def parse_scale(spec):
+    """Returns (name, rows, kpis) for a preset name or a ROWSxKPIS spec such as 50000x10."""
+    if spec in SCALES:
+        return (spec, *SCALES[spec])
+    rows, _, kpis = spec.lower().partition("x")
+    return spec, int(rows), int(kpis)
+
+
+def generate_chunks(rows, kpis, chunk_rows=500_000, years=4, gap_ratio=0.05, nan_ratio=0.01, seed=0):
+    """Yields Date-sorted chunks totalling `rows` rows.
+
+    Rows are spread over `years` years of days with roughly gap_ratio of the days
+    missing entirely, so most days carry several rows (duplicated dates). Each KPI
+    is a seasonal signal plus noise at its own scale; every third KPI is an integer
+    count and about nan_ratio of the float values are missing.
+    """
+    rng = np.random.default_rng(seed)
+    days = pd.date_range("2021-04-01", periods=365 * years, freq="D")
+    days = days[rng.random(len(days)) >= gap_ratio]
+    day_of_year = days.dayofyear.to_numpy()
+    scales = 10.0 ** rng.integers(0, 5, kpis)
+    plants = np.array(["North", "South", "East", "West"])
+
+    # Row i falls on day floor(i * len(days) / rows), so chunks stay in date order
+    for start in range(0, rows, chunk_rows):
+        stop = min(rows, start + chunk_rows)
+        day_index = np.arange(start, stop) * len(days) // rows
+        season = np.sin(2 * np.pi * day_of_year[day_index] / 365.25)
+        columns = {"Date": days[day_index].strftime("%Y-%m-%d"), "Plant": plants[rng.integers(0, 4, stop - start)]}
+        for k in range(kpis):
+            values = scales[k] * (1 + 0.3 * season + 0.1 * rng.standard_normal(stop - start))
+            if k % 3 == 2:
+                columns[f"KPI_{k}"] = np.round(values).astype(np.int64)
+            else:
+                values[rng.random(stop - start) < nan_ratio] = np.nan
+                columns[f"KPI_{k}"] = values
+        yield pd.DataFrame(columns)
+
+
+def generate(rows, kpis, **kwargs):
+    """The whole synthetic dataset as one frame."""
+    return pd.concat(generate_chunks(rows, kpis, **kwargs), ignore_index=True)
+
+
+def write(path, fmt, rows, kpis, **kwargs):
+    """Writes a synthetic dataset as csv, json (a records array, like the app expects),
+    jsonl (line-delimited, for streaming ingest) or xlsx."""
+    if fmt == "csv":
+        for i, chunk in enumerate(generate_chunks(rows, kpis, **kwargs)):
+            chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    elif fmt == "json":
+        generate(rows, kpis, **kwargs).to_json(path, orient="records")
+    elif fmt == "jsonl":
+        for i, chunk in enumerate(generate_chunks(rows, kpis, **kwargs)):
+            with open(path, "w" if i == 0 else "a", encoding="utf-8") as out:
+                chunk.to_json(out, orient="records", lines=True)
+    elif fmt == "xlsx":
+        generate(rows, kpis, **kwargs).to_excel(path, index=False, engine="xlsxwriter")
+    else:
+        raise ValueError(f"Unsupported benchmark format: {fmt}")
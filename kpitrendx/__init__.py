@@ -0,0 +1,7 @@
+"""KPITrendX analytics core used by the Streamlit app."""
+import pandas as pd
+
+# Datasets are shared between sessions through shallow-copied views, which are only
+# isolated under copy-on-write: the default from pandas 3, opt-in on pandas 2.x
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
@@ -0,0 +1,103 @@
+"""Incremental ingest: appending a delta upload to an already ingested dataset.
+
+The delta is validated against the dataset's columns and merged in date order,
+and its daily rollup is folded into the existing rollups, so only the days,
+weeks and months it touches are aggregated again.
+"""
+import pandas as pd
+
+from .cache import chained_key, content_key, shared_cache
+from .compact import compact_frame
+from .dataset import Dataset
+from .loader import SUPPORTED_FORMATS, LoadError, normalise, read_frame
+from .registry import shared_registry
+from .rollup import daily_rollup, update_rollups
+from .store import shared_store
+
+
+def validate_delta(frame, delta):
+    """Checks that a normalised delta has the dataset's columns and numeric KPIs,
+    returning it with the columns in the dataset's order."""
+    missing = [col for col in frame.columns if col not in delta.columns]
+    if missing:
+        raise LoadError(f"Appended file is missing columns: {', '.join(map(str, missing))}.")
+    extra = [col for col in delta.columns if col not in frame.columns]
+    if extra:
+        raise LoadError(f"Appended file has columns that are not in the dataset: {', '.join(map(str, extra))}.")
+    delta = delta[list(frame.columns)]
+    for col in frame.columns:
+        if col == "Date" or not pd.api.types.is_numeric_dtype(frame[col]) or pd.api.types.is_numeric_dtype(delta[col]):
+            continue
+        if delta[col].notna().any():
+            raise LoadError(f"Column '{col}' must be numeric in the appended file.")
+        # An all-empty column is read as object; give it the dataset's numeric type
+        delta[col] = delta[col].astype("float64")
+    return delta
+
+
+def merge_frames(frame, delta):
+    """Concatenates a validated delta onto a Date-sorted frame, keeping it sorted.
+
+    Rows of a day present in both stay after the existing rows of that day.
+    """
+    delta = delta.copy()
+    for col in frame.columns:
+        if isinstance(frame[col].dtype, pd.CategoricalDtype):
+            # Widen the categories so the merged column stays categorical
+            categories = frame[col].cat.categories.union(pd.Index(delta[col].dropna().unique()), sort=False)
+            dtype = pd.CategoricalDtype(categories, ordered=frame[col].cat.ordered)
+            frame = frame.assign(**{col: frame[col].astype(dtype)})
+            delta[col] = delta[col].astype(dtype)
+    merged = pd.concat([frame, delta], ignore_index=True)
+    if not frame.empty and delta["Date"].iloc[0] < frame["Date"].iloc[-1]:
+        merged.sort_values("Date", kind="stable", inplace=True, ignore_index=True)
+    return merged
+
+
+def append_bytes(dataset, data, file_extension, rollups, cache=shared_cache, store=shared_store, registry=shared_registry,
+                 name=None):
+    """Returns the Dataset of dataset plus the rows of a delta upload.
+
+    rollups are the dataset's current rollups; the new dataset's rollups are them
+    updated with the delta rather than rebuilt. The new key is derived from the
+    dataset key and the delta hash, so the same append is only done once, and the
+    stored copy of the old dataset becomes the first candidate for pruning. A streamed
+    dataset keeps its sample frame and only its rollups and row count grow.
+    name is the delta's file name, added to the dataset's own.
+    """
+    if file_extension not in SUPPORTED_FORMATS:
+        raise LoadError("Unsupported file format. Please upload a CSV, Excel, or JSON file.")
+
+    key = chained_key(dataset.key, content_key(data, file_extension))
+    appended_name = f"{dataset.name} + {name or 'appended rows'}"
+
+    def build():
+        streamed = "rollups" in dataset.pinned
+        frame = None if streamed else store.read(key)
+        if frame is not None:
+            # Appended before: the rollups are rebuilt from the stored frame when first needed
+            return Dataset(key, frame, cache)
+
+        delta = validate_delta(dataset.frame, normalise(read_frame(data, file_extension)))
+        kpis = list(rollups["D"]["sum"].columns)
+        extremes = "min" in rollups["D"].columns.get_level_values(0)
+        updated = update_rollups(rollups, daily_rollup(delta, kpis, extremes=extremes))
+
+        if streamed:
+            pinned = dict(dataset.pinned, rollups=updated)
+            return Dataset(key, dataset.frame, cache, pinned=pinned, source_rows=dataset.source_rows + len(delta),
+                           name=appended_name)
+
+        frame = merge_frames(dataset.frame, delta)
+        if dataset.compaction:
+            frame = compact_frame(frame)
+        frame.attrs["source"] = appended_name
+        if store.write(key, frame):
+            # The old file is still needed to reopen the chain from its base, but it is pruned
+            # before anything else once the store is over budget
+            store.demote(dataset.key)
+        appended = Dataset(key, frame, cache)
+        cache.put((key, "rollups"), updated)
+        return appended
+
+    return registry.get_or_create(key, build)
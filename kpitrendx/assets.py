@@ -0,0 +1,24 @@
+"""Process-wide cache of inlined landing-page media."""
+import base64
+import os
+import threading
+
+_encoded = {}
+_lock = threading.Lock()
+
+
+def base64_asset(path):
+    """Base64 payload of a file, encoded once per process and re-read only when the
+    file's modification time or size changes."""
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        cached = _encoded.get(path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    with open(path, "rb") as asset_file:
+        payload = base64.b64encode(asset_file.read()).decode("utf-8")
+    with _lock:
+        _encoded[path] = (version, payload)
+    return payload
@@ -0,0 +1,251 @@
+"""Headless KPI reports for many files at once.
+
+Usage:
+    python -m kpitrendx.batch data/plants --out reports
+    python -m kpitrendx.batch "data/*.xlsx" --interval 1M --interval 3Y --chart png --workers 8
+
+Each input file goes through the same engine calls as the dashboard: interval
+views of every KPI, then a financial-year comparison and pivot per KPI. Files are
+processed in parallel across a process pool and written to <out>/<file stem>/
+(<file name>/ when stems clash, e.g. plant.csv and plant.xlsx), with a summary.json of every file's status and stage timings in <out>. Inputs are
+only kept in the columnar dataset store with --store.
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from . import engine
+from .charts import comparison_figure, trend_figure
+from .downsample import DEFAULT_CHART_WIDTH_PX, downsample
+from .export import EXPORT_FORMATS, export_bytes
+from .fiscal import DEFAULT_FY_START_MONTH
+from .loader import SUPPORTED_FORMATS, LoadError, file_format
+from .perf import PipelineTrace
+from .registry import shared_registry
+from .store import ColumnarStore, shared_store
+from .streaming import can_stream
+
+logger = logging.getLogger(__name__)
+
+CHART_FORMATS = ("html", "png", "none")
+
+
+def discover(sources):
+    """Input files named by paths, directories (not recursed) or glob patterns, sorted and de-duplicated."""
+    found = []
+    for source in sources:
+        if os.path.isdir(source):
+            candidates = [os.path.join(source, name) for name in os.listdir(source)]
+        elif os.path.isfile(source):
+            candidates = [source]
+        else:
+            candidates = glob.glob(source, recursive=True)
+        found.extend(path for path in candidates
+                     if os.path.isfile(path) and file_format(path) in SUPPORTED_FORMATS)
+    return sorted(set(os.path.abspath(path) for path in found))
+
+
+def png_available():
+    """Static image export needs the optional kaleido package."""
+    try:
+        import kaleido  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _slug(name):
+    return re.sub(r"[^\w.-]+", "_", str(name)).strip("_") or "kpi"
+
+
+def output_names(paths):
+    """Output directory name of each path: its file stem, or its file name when another
+    input has the same stem, plus a counter when even those clash (a/plant.csv, b/plant.csv)."""
+    stems = {}
+    for path in paths:
+        stem = _slug(os.path.splitext(os.path.basename(path))[0]).lower()
+        stems[stem] = stems.get(stem, 0) + 1
+    names, taken = {}, set()
+    for path in paths:
+        base_name = os.path.basename(path)
+        name = _slug(os.path.splitext(base_name)[0])
+        if stems[name.lower()] > 1:
+            name = _slug(base_name)
+        unique, counter = name, 2
+        # Compared case-insensitively, as on Windows and macOS file systems
+        while unique.lower() in taken:
+            unique, counter = f"{name}-{counter}", counter + 1
+        taken.add(unique.lower())
+        names[path] = unique
+    return names
+
+
+def _write_table(df, directory, stem, formats):
+    for fmt in formats:
+        with open(os.path.join(directory, stem + EXPORT_FORMATS[fmt][1]), "wb") as out:
+            out.write(export_bytes(df, fmt))
+
+
+def _write_chart(fig, directory, stem, chart):
+    if chart == "html":
+        # The plotly.js bundle is loaded from a CDN rather than embedded in every file
+        fig.write_html(os.path.join(directory, stem + ".html"), include_plotlyjs="cdn")
+    elif chart == "png":
+        fig.write_image(os.path.join(directory, stem + ".png"))
+
+
+def _streamable(path):
+    with open(path, "rb") as file:
+        return can_stream(file, file_format(path))
+
+
+def report(path, out_dir, intervals, kpis=None, end_date=None, as_of=None,
+           fy_start_month=DEFAULT_FY_START_MONTH, formats=("csv",), chart="html", streaming=False, store=False, name=None):
+    """Writes the trend and FY comparison outputs of one file to <out_dir>/<name>/
+    (default: its file stem); returns its summary entry."""
+    trace = PipelineTrace(run_name=os.path.basename(path))
+    directory = os.path.join(out_dir, name or _slug(os.path.splitext(os.path.basename(path))[0]))
+    summary = {"file": path, "output": directory, "status": "ok", "outputs": []}
+    dataset = None
+    try:
+        with trace.stage("load_data") as stage:
+            # Inputs that cannot be read chunk by chunk, such as Excel files, are loaded whole
+            summary["streaming"] = streaming and _streamable(path)
+            # Nightly inputs change every run, so by default they are not copied into the store
+            dataset = engine.load(path, streaming=summary["streaming"], store=shared_store if store else ColumnarStore(""))
+            stage.rows_out = dataset.source_rows
+
+        available_kpis = engine.numeric_kpis(dataset)
+        selected_kpis = [kpi for kpi in kpis if kpi in available_kpis] if kpis else available_kpis
+        if not selected_kpis:
+            raise LoadError("No numeric KPIs found in the dataset.")
+
+        with trace.stage("rollups", rows_in=len(dataset.frame)) as stage:
+            stage.rows_out = len(engine.rollups(dataset)["D"])
+        end_date = pd.Timestamp(end_date) if end_date is not None else engine.date_bounds(dataset)[1]
+
+        os.makedirs(directory, exist_ok=True)
+        for interval in intervals:
+            with trace.stage(f"interval_view[{interval}]") as stage:
+                view = engine.interval_view(dataset, interval, end_date, today=as_of)[["Date"] + selected_kpis]
+                stage.rows_out = len(view)
+            stem = f"trend_{interval}"
+            _write_table(view, directory, stem, formats)
+            if chart != "none" and not view.empty:
+                with trace.stage(f"trend_figure[{interval}]"):
+                    df_melted = view.melt(id_vars=["Date"], value_vars=selected_kpis, var_name="KPI", value_name="Value")
+                    df_melted = downsample(df_melted, "Date", "Value", max_points=DEFAULT_CHART_WIDTH_PX, by="KPI")
+                    _write_chart(trend_figure(df_melted), directory, stem, chart)
+            summary["outputs"].append(stem)
+
+        financial_years = engine.financial_years(dataset, fy_start_month)
+        for kpi in selected_kpis:
+            with trace.stage(f"compare_fiscal_years[{kpi}]") as stage:
+                final_df = engine.compare_fiscal_years(dataset, kpi, financial_years, fy_start_month)
+                pivot_df = engine.comparison_pivot(final_df, kpi)
+                stage.rows_out = len(final_df)
+            stem = f"fy_comparison_{_slug(kpi)}"
+            _write_table(final_df, directory, stem, formats)
+            _write_table(pivot_df, directory, f"fy_pivot_{_slug(kpi)}", formats)
+            if chart != "none" and not final_df.empty:
+                with trace.stage(f"comparison_figure[{kpi}]"):
+                    _write_chart(comparison_figure(final_df, kpi), directory, stem, chart)
+            summary["outputs"].append(stem)
+    except Exception as e:
+        # One bad file must not stop the rest of the batch
+        summary["status"] = "error"
+        summary["error"] = str(e) if isinstance(e, LoadError) else f"{type(e).__name__}: {e}"
+    finally:
+        # Each file is reported once, so there is no point keeping it for other sessions
+        if dataset is not None:
+            shared_registry.discard(dataset.key)
+    summary["trace"] = trace.to_dict()
+    trace.finish()
+    return summary
+
+
+def run(paths, out_dir, workers=None, **options):
+    """Reports every path, across a process pool when workers > 1; returns summaries in input order."""
+    workers = workers or os.cpu_count() or 1
+    names = output_names(paths)
+    if workers == 1 or len(paths) <= 1:
+        summaries = []
+        for path in paths:
+            summaries.append(report(path, out_dir, name=names[path], **options))
+            _log_done(summaries[-1])
+        return summaries
+
+    summaries = {}
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+        futures = {pool.submit(report, path, out_dir, name=names[path], **options): path for path in paths}
+        for future in as_completed(futures):
+            summaries[futures[future]] = future.result()
+            _log_done(summaries[futures[future]])
+    return [summaries[path] for path in paths]
+
+
+def _log_done(summary):
+    if summary["status"] == "ok":
+        logger.info("%s: %d outputs in %.2fs", summary["file"], len(summary["outputs"]), summary["trace"]["total_seconds"])
+    else:
+        logger.error("%s: %s", summary["file"], summary["error"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sources", nargs="+", help="files, directories or glob patterns (%s)" % ", ".join(SUPPORTED_FORMATS))
+    parser.add_argument("--out", default="reports", help="output directory")
+    parser.add_argument("--interval", action="append", choices=list(engine.INTERVALS), help="trend intervals; repeatable (default: all)")
+    parser.add_argument("--kpi", action="append", help="KPI columns to report; repeatable (default: every numeric column)")
+    parser.add_argument("--end-date", help="last day of the trend views (default: last day in each file)")
+    parser.add_argument("--as-of", help="'today' for the 1Y/3Y views (default: today)")
+    parser.add_argument("--fy-start", type=int, default=DEFAULT_FY_START_MONTH, choices=range(1, 13), metavar="MONTH",
+                        help="first month of the financial year (default: %(default)s)")
+    parser.add_argument("--format", action="append", choices=list(EXPORT_FORMATS), help="table formats; repeatable (default: csv)")
+    parser.add_argument("--chart", choices=CHART_FORMATS, default="html", help="png needs kaleido (default: %(default)s)")
+    parser.add_argument("--streaming", action="store_true", help="aggregate CSV/JSON Lines inputs chunk by chunk; other inputs are loaded whole")
+    parser.add_argument("--store", action="store_true", help="keep an Arrow copy of each input in the dataset store for faster reruns")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("kpitrendx.perf").setLevel(logging.WARNING)
+
+    paths = discover(args.sources)
+    if not paths:
+        parser.error("no supported input files found")
+    chart = args.chart
+    if chart == "png" and not png_available():
+        logger.warning("kaleido is not installed; writing HTML charts instead of PNG")
+        chart = "html"
+
+    os.makedirs(args.out, exist_ok=True)
+    summaries = run(
+        paths, args.out, workers=args.workers,
+        intervals=args.interval or list(engine.INTERVALS),
+        kpis=args.kpi,
+        end_date=args.end_date,
+        as_of=args.as_of,
+        fy_start_month=args.fy_start,
+        formats=tuple(args.format or ["csv"]),
+        chart=chart,
+        streaming=args.streaming,
+        store=args.store,
+    )
+    with open(os.path.join(args.out, "summary.json"), "w", encoding="utf-8") as out:
+        json.dump(summaries, out, indent=2, default=str)
+
+    failed = sum(summary["status"] != "ok" for summary in summaries)
+    logger.info("%d of %d files reported to %s", len(summaries) - failed, len(summaries), os.path.abspath(args.out))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""Process-wide LRU cache with a memory budget, shared by every Streamlit session."""
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# Memory budget in MB, overridable with the KPITRENDX_CACHE_MB environment variable
+DEFAULT_BUDGET_MB = 1024
+
+
+def content_key(data, file_extension):
+    """Builds a cache key from a hash of the uploaded bytes plus the file format."""
+    digest = hashlib.blake2b(data, digest_size=20).hexdigest()
+    return f"{file_extension}:{digest}"
+
+
+def file_content_key(file, file_extension, block_size=8 * 1024 * 1024):
+    """Same as content_key, but hashes a seekable file object block by block."""
+    digest = hashlib.blake2b(digest_size=20)
+    file.seek(0)
+    for block in iter(lambda: file.read(block_size), b""):
+        digest.update(block)
+    file.seek(0)
+    return f"{file_extension}:{digest.hexdigest()}"
+
+
+def chained_key(base_key, delta_key):
+    """Key of a dataset built by appending the upload delta_key to the dataset base_key."""
+    digest = hashlib.blake2b(f"{base_key}+{delta_key}".encode(), digest_size=20).hexdigest()
+    return f"append:{digest}"
+
+
+def sizeof(value):
+    """Estimates the resident size of a cached value in bytes."""
+    if hasattr(value, "nbytes") and not isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(value.nbytes)
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(value, pd.DataFrame) else int(usage)
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(sizeof(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """Least-recently-used cache that evicts entries once their total size exceeds max_bytes.
+
+    Cached values are shared between sessions and must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+
+    def put(self, key, value, nbytes=None):
+        if nbytes is None:
+            nbytes = sizeof(value)
+        with self._lock:
+            self._remove(key)
+            # Values larger than the whole budget are returned to the caller but never kept
+            if nbytes > self.max_bytes:
+                return value
+            while self._entries and self._bytes + nbytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+            self._entries[key] = (value, nbytes)
+            self._bytes += nbytes
+        return value
+
+    def get_or_compute(self, key, compute, max_bytes=None):
+        """Returns the cached value for key, computing and storing it on a miss.
+
+        Computed values larger than max_bytes are returned without being stored.
+        """
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = compute()
+            nbytes = sizeof(value)
+            if max_bytes is None or nbytes <= max_bytes:
+                self.put(key, value, nbytes)
+        return value
+
+    def discard(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+
+shared_cache = LRUCache(int(float(os.environ.get("KPITRENDX_CACHE_MB", DEFAULT_BUDGET_MB)) * 1024 * 1024))
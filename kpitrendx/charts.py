@@ -0,0 +1,49 @@
+"""Plotly figures shared by the dashboard and the batch reports."""
+import plotly.express as px
+import plotly.graph_objects as go
+
+
+def trend_figure(df_melted):
+    """Line chart of a long Date/KPI/Value frame."""
+    fig = px.line(df_melted, x="Date", y="Value", color="KPI", title="KPI Trend Over Time", template="plotly_dark")
+    fig.update_layout(
+        hovermode="x unified",
+        margin=dict(l=20, r=20, t=30, b=20),
+        paper_bgcolor="#222",
+        plot_bgcolor="#222",
+        xaxis=dict(showgrid=False),
+        yaxis=dict(showgrid=False)
+    )
+    return fig
+
+
+def distribution_figure(hist_df):
+    """Overlaid bar histogram of histogram.histogram_counts output."""
+    fig = go.Figure()
+    for kpi, bins in hist_df.groupby("KPI", sort=False):
+        fig.add_trace(go.Bar(
+            name=kpi,
+            x=(bins["Bin Start"] + bins["Bin End"]) / 2,
+            y=bins["Count"],
+            width=bins["Bin End"] - bins["Bin Start"],
+            opacity=0.6,
+            hovertemplate="%{x}<br>Count: %{y}<extra>" + kpi + "</extra>",
+        ))
+    fig.update_layout(title="KPI Distribution", template="plotly_dark", barmode="overlay", xaxis_title="value", yaxis_title="count")
+    return fig
+
+
+def comparison_figure(final_df, kpi):
+    """Monthly kpi lines, one per financial year or time range."""
+    fig = px.line(final_df,
+                  x="Month",
+                  y=kpi,
+                  color="Financial Year",
+                  title="KPI Comparison Across Financial Years",
+                  template="plotly_dark",
+                  markers=True)
+
+    # Add hover lines
+    fig.update_traces(mode='lines+markers', hovertemplate='Month: %{x}<br>KPI: %{y}<extra></extra>')
+    fig.update_layout(hovermode="x unified")  # Adds the vertical hover line
+    return fig
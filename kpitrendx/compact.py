@@ -0,0 +1,69 @@
+"""Optional memory-compaction pass that downcasts column dtypes at ingest."""
+import numpy as np
+import pandas as pd
+
+# Floats move to float32 only if no value has more significant decimal digits than
+# this; float32 reproduces any 6-digit decimal exactly when printed back to 6 digits
+FLOAT32_DIGITS = 6
+
+# Text columns become categorical when distinct values are at most this share of the rows
+CATEGORY_RATIO = 0.5
+
+
+def _has_digits(values, digits):
+    """True if every finite value equals itself rounded to the given significant digits."""
+    values = values[np.isfinite(values) & (values != 0)]
+    if not len(values):
+        return True
+    # Scale each value so its significant digits sit left of the decimal point
+    scaled = values * 10.0 ** (digits - 1 - np.floor(np.log10(np.abs(values))))
+    # Scaled values are below 10**digits, so anything beyond float64 noise is a lost digit
+    return bool(np.all(np.abs(scaled - np.round(scaled)) <= 1e-6))
+
+
+def _compact_column(series, float_digits, category_ratio):
+    """Returns a smaller version of series, or None if it should stay as it is."""
+    dtype = series.dtype
+    if dtype == np.float64:
+        values = series.to_numpy()
+        with np.errstate(over="ignore"):
+            narrow = values.astype(np.float32)
+        in_range = np.array_equal(np.isfinite(narrow), np.isfinite(values))
+        if in_range and _has_digits(values, float_digits):
+            return pd.Series(narrow, index=series.index, name=series.name)
+    elif pd.api.types.is_integer_dtype(dtype) and isinstance(dtype, np.dtype):
+        kind = "unsigned" if len(series) and series.min() >= 0 else "integer"
+        narrow = pd.to_numeric(series, downcast=kind)
+        if narrow.dtype.itemsize < dtype.itemsize:
+            return narrow
+    elif pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+        if len(series) and series.nunique(dropna=True) <= category_ratio * len(series):
+            return series.astype("category")
+    return None
+
+
+def compact_frame(df, float_digits=FLOAT32_DIGITS, category_ratio=CATEGORY_RATIO):
+    """Returns a copy of df with float32 floats where no value has more than
+    float_digits significant digits, the smallest integer types that fit and
+    categorical low-cardinality text columns.
+
+    The memory report is stored in the returned frame's attrs["compaction"] and is
+    kept when the frame goes through the columnar store.
+    """
+    before = int(df.memory_usage(deep=True).sum())
+    compacted = df.copy(deep=False)
+    changed = {}
+    for col in df.columns:
+        if col == "Date":
+            continue
+        narrow = _compact_column(df[col], float_digits, category_ratio)
+        if narrow is not None:
+            compacted[col] = narrow
+            changed[str(col)] = [str(df[col].dtype), str(narrow.dtype)]
+
+    compacted.attrs["compaction"] = {
+        "before_bytes": before,
+        "after_bytes": int(compacted.memory_usage(deep=True).sum()),
+        "columns": changed,
+    }
+    return compacted
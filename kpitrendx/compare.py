@@ -0,0 +1,79 @@
+"""KPI comparison across date ranges and fiscal years, computed from the daily rollup.
+
+All requested ranges are resolved against the sorted daily index with a single
+searchsorted call and aggregated in one groupby, so no per-range copy of the
+data is ever made.
+"""
+import numpy as np
+import pandas as pd
+
+GROUP_KEYS = ["Time Range", "Financial Year", "Month"]
+
+
+def range_rows(index, ranges):
+    """Row positions of index covered by each (start, end) range, plus the range number
+    of every position. Overlapping ranges simply repeat the shared positions."""
+    starts = pd.DatetimeIndex([pd.Timestamp(start) for start, _ in ranges])
+    ends = pd.DatetimeIndex([pd.Timestamp(end) for _, end in ranges])
+    lo = index.searchsorted(starts, side="left")
+    hi = index.searchsorted(ends, side="right")
+    lengths = np.maximum(hi - lo, 0)
+
+    range_ids = np.repeat(np.arange(len(ranges)), lengths)
+    # Position within each range's run, shifted to that range's first row
+    run_starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    rows = np.arange(lengths.sum()) - run_starts + np.repeat(lo, lengths)
+    return rows, range_ids
+
+
+def _monthly_means(daily, calendar, kpi, rows, labels):
+    """Row-weighted mean of kpi per (Time Range, Financial Year, Month) for the given
+    daily rollup rows, each tagged with its Time Range label."""
+    # take() keeps the ordered categoricals, so months sort in fiscal rather than alphabetical order
+    grouped = pd.DataFrame({
+        "Time Range": labels,
+        "Financial Year": calendar["Financial Year"].array.take(rows),
+        "Month": calendar["Month"].array.take(rows),
+        "sum": daily[("sum", kpi)].to_numpy()[rows],
+        "count": daily[("count", kpi)].to_numpy()[rows],
+    }).groupby(GROUP_KEYS, observed=True, sort=False).sum()
+
+    final_df = grouped.reset_index()
+    final_df[kpi] = final_df["sum"] / final_df["count"].where(final_df["count"] > 0)
+    final_df = final_df[["Financial Year", "Month", kpi, "Time Range"]]
+    return final_df.sort_values(["Financial Year", "Month"], kind="stable", ignore_index=True)
+
+
+def compare_ranges(rollups, calendar, kpi, ranges):
+    """Monthly means of kpi per financial year for every (start, end) date range.
+
+    calendar is the fiscal calendar of the daily rollup index.
+    """
+    daily = rollups["D"]
+    rows, range_ids = range_rows(daily.index, ranges)
+    names = np.array([
+        f"Range {i + 1}: {pd.Timestamp(start)} to {pd.Timestamp(end)}" for i, (start, end) in enumerate(ranges)
+    ], dtype=object)
+    return _monthly_means(daily, calendar, kpi, rows, names[range_ids])
+
+
+def compare_fiscal_years(rollups, calendar, kpi, fiscal_years):
+    """Monthly means of kpi for each of the selected financial years."""
+    daily = rollups["D"]
+    financial_year = calendar["Financial Year"]
+    rows = np.flatnonzero(financial_year.isin(fiscal_years).to_numpy())
+    labels = "Selected: " + financial_year.to_numpy()[rows].astype(object)
+    return _monthly_means(daily, calendar, kpi, rows, labels)
+
+
+def comparison_pivot(final_df, kpi):
+    """Months as rows and financial years as columns, one per time range covering the
+    year when several ranges overlap in it."""
+    columns = final_df[["Time Range", "Financial Year"]].drop_duplicates()
+    pivot = final_df.pivot(index="Month", columns=["Time Range", "Financial Year"], values=kpi)
+    pivot = pivot.reindex(columns=pd.MultiIndex.from_frame(columns))
+    if columns["Financial Year"].is_unique:
+        pivot.columns = pivot.columns.get_level_values("Financial Year")
+    else:
+        pivot.columns = pd.Index([f"{year} ({time_range})" for time_range, year in pivot.columns], name="Financial Year")
+    return pivot.reset_index()
@@ -0,0 +1,57 @@
+"""Ingested datasets and the derived tables cached alongside them."""
+import copy
+
+from .cache import shared_cache, sizeof
+
+
+class Dataset:
+    """A normalised KPI frame identified by the content hash of its source upload.
+
+    Derived tables (fiscal calendar, rollups, ...) are memoised in the shared cache
+    under the dataset key, so every session working on the same upload reuses them.
+    The frame is shared and must be treated as read-only; sessions work on view()s.
+
+    Tables that cannot be recomputed from the frame, such as the rollups of a
+    streamed upload whose frame is only a sample, are passed in as pinned and
+    are never evicted.
+
+    name describes the source for people picking a dataset to reopen; it defaults
+    to the one kept in frame.attrs["source"], which the columnar store preserves.
+    """
+
+    def __init__(self, key, frame, cache=shared_cache, pinned=None, source_rows=None, name=None):
+        self.key = key
+        self.frame = frame
+        self.name = name or frame.attrs.get("source") or key
+        self.cache = cache
+        self.pinned = dict(pinned or {})
+        self.source_rows = len(frame) if source_rows is None else source_rows
+        self.nbytes = sizeof(frame) + sizeof(self.pinned)
+
+    @property
+    def compaction(self):
+        """Memory report of the dtype compaction pass, if the frame went through it."""
+        return self.frame.attrs.get("compaction")
+
+    @property
+    def is_sample(self):
+        """True when frame holds only a sample of the source rows."""
+        return self.source_rows > len(self.frame)
+
+    def view(self):
+        """A handle on the same dataset whose frame is a shallow copy.
+
+        With copy-on-write, which the package switches on for pandas 2.x, writes
+        through the view copy the touched columns first, so a session can never
+        modify the shared frame.
+        """
+        view = copy.copy(self)
+        view.frame = self.frame.copy(deep=False)
+        return view
+
+    def derived(self, name, compute, max_bytes=None):
+        """Returns the derived table called name, computing it on first use (and
+        recomputing it every time if it is larger than max_bytes)."""
+        if name in self.pinned:
+            return self.pinned[name]
+        return self.cache.get_or_compute((self.key, name), compute, max_bytes)
@@ -0,0 +1,76 @@
+"""Server-side downsampling of line-chart series.
+
+Both methods keep the first and last point and return row positions, so the
+caller can subset any frame that holds the series.
+"""
+import numpy as np
+import pandas as pd
+
+# Roughly the plot width of a wide-layout chart; one point per pixel is enough for a line
+DEFAULT_CHART_WIDTH_PX = 1200
+
+
+def _as_float(values):
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        values = values.astype("datetime64[ns]").astype(np.int64)
+    return values.astype(np.float64)
+
+
+def lttb_indices(x, y, threshold):
+    """Largest-Triangle-Three-Buckets: positions of `threshold` points that preserve the
+    visual shape of the series, including its peaks and troughs."""
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = _as_float(x)
+    y = _as_float(y)
+
+    # Interior points are split into threshold - 2 buckets; first and last are always kept
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # Average of the next bucket (or the last point) is the third triangle vertex
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[end:next_end].mean()
+        next_y = y[end:next_end].mean()
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def minmax_indices(y, n_buckets):
+    """Positions of the minimum and maximum of each of n_buckets equal-sized buckets,
+    plus the first and last point: at most 2 * n_buckets + 2 positions."""
+    n = len(y)
+    if 2 * n_buckets >= n or n_buckets < 1:
+        return np.arange(n)
+    buckets = pd.Series(_as_float(y)).groupby(np.arange(n) * n_buckets // n)
+    picks = np.concatenate([buckets.idxmin().to_numpy(), buckets.idxmax().to_numpy(), [0, n - 1]])
+    return np.unique(picks)
+
+
+def downsample(df, x, y, max_points=DEFAULT_CHART_WIDTH_PX, by=None, method="lttb"):
+    """Reduces each series of df (one per value of the `by` column) to at most
+    max_points rows. Rows with a missing y are dropped first."""
+    df = df.dropna(subset=[y])
+    groups = df.groupby(by, sort=False, observed=True) if by else [(None, df)]
+    keep = []
+    for _, series in groups:
+        if method == "minmax":
+            # Two points per bucket plus the first and last point must fit in max_points
+            positions = minmax_indices(series[y].to_numpy(), (max_points - 2) // 2)
+        else:
+            positions = lttb_indices(series[x].to_numpy(), series[y].to_numpy(), max_points)
+        keep.append(series.iloc[positions])
+    if not keep:
+        return df
+    return pd.concat(keep)
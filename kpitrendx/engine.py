@@ -0,0 +1,186 @@
+"""UI-free analytics engine behind the dashboard.
+
+Every function takes a Dataset returned by load() and returns plain DataFrames.
+Results are memoised on the dataset, so repeated calls with the same arguments,
+from any session or batch job in the process, are served from the shared cache.
+"""
+import os
+
+import pandas as pd
+
+from . import compare, fiscal, rollup
+from .append import append_bytes
+from .dataset import Dataset
+from .histogram import histogram_counts
+from .loader import LoadError, file_format, load_bytes
+from .registry import shared_registry
+from .store import shared_store
+from .streaming import load_stream
+
+# Interval button -> (days back from the end date, rollup frequency)
+INTERVALS = {"1W": (7, "D"), "1M": (30, "D"), "3M": (90, "W"), "6M": (180, "W"), "1Y": (365, "M"), "3Y": (1095, "M")}
+
+# Weekly views show only the most recent weeks
+RECENT_WEEKS = {"3M": 12, "6M": 26}
+
+# Monthly views show only months within this many years of today
+RECENT_YEARS = {"1Y": 1, "3Y": 3}
+
+
+def _read_source(source, file_extension):
+    """Raw bytes, file format and file name (None for bytes) of a path, a file-like
+    object with a name, or bytes."""
+    name = None
+    if isinstance(source, (str, os.PathLike)):
+        name = os.path.basename(os.fspath(source))
+        file_extension = file_extension or file_format(name)
+        with open(source, "rb") as file:
+            source = file.read()
+    elif not isinstance(source, (bytes, bytearray, memoryview)):
+        name = os.path.basename(source.name)
+        file_extension = file_extension or file_format(name)
+        source = source.getvalue() if hasattr(source, "getvalue") else source.read()
+    if file_extension is None:
+        raise LoadError("A file format is required when loading raw bytes.")
+    return bytes(source), file_extension, name
+
+
+def load(source, file_extension=None, streaming=False, compact=False, store=shared_store):
+    """Loads a KPI file from a path, a file-like object with a name, or raw bytes.
+
+    With streaming, CSV and line-delimited JSON are aggregated chunk by chunk and
+    the dataset frame is only a sample (see streaming.load_stream). Raises LoadError
+    when the file cannot be used.
+    """
+    if streaming:
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, "rb") as file:
+                return load_stream(file, file_extension or file_format(os.fspath(source)))
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            raise LoadError("Streaming ingest needs a file path or file object.")
+        return load_stream(source, file_extension or file_format(source.name))
+    data, file_extension, name = _read_source(source, file_extension)
+    return load_bytes(data, file_extension, compact=compact, store=store, name=name)
+
+
+def append(dataset, source, file_extension=None):
+    """Adds the rows of a delta file (path, file-like object or bytes) to a dataset.
+
+    The delta must have the dataset's columns. Returns a new Dataset whose rollups
+    are the dataset's updated with the new days only (see append.append_bytes).
+    """
+    data, file_extension, name = _read_source(source, file_extension)
+    return append_bytes(dataset, data, file_extension, rollups(dataset), name=name)
+
+
+def ingested(store=shared_store, registry=shared_registry):
+    """(key, name) of every dataset that can be reopened without its source file:
+    the ones in memory, then the stored ones, each most recently used first."""
+    found = {dataset.key: dataset.name for dataset in registry.datasets()}
+    for key, name in store.catalog():
+        found.setdefault(key, name)
+    return list(found.items())
+
+
+def reopen(key, store=shared_store, registry=shared_registry):
+    """The dataset listed by ingested() under key, e.g. to append new days to it.
+
+    Raises LoadError when it has been evicted and pruned from the store since.
+    """
+    def build():
+        frame = store.read(key)
+        if frame is None:
+            raise LoadError("This dataset is no longer available; please upload it again.")
+        return Dataset(key, frame)
+
+    return registry.get_or_create(key, build)
+
+
+def numeric_kpis(dataset):
+    """Columns that can be charted and aggregated as KPIs."""
+    df = dataset.frame
+    return [col for col in df.columns if col != "Date" and pd.api.types.is_numeric_dtype(df[col])]
+
+
+def rollups(dataset):
+    """Day, week and month sums and counts of every numeric KPI."""
+    return dataset.derived("rollups", lambda: rollup.build_rollups(dataset.frame, numeric_kpis(dataset)))
+
+
+def date_bounds(dataset):
+    """First and last day with data."""
+    daily = rollups(dataset)["D"]
+    return daily.index[0], daily.index[-1]
+
+
+def view_key(interval, end_date, today=None):
+    """Identity of an interval view: everything its rows depend on, including today.
+
+    Tables derived from a view (histograms, sort orders, exports) must be cached
+    under this key, or they outlive the view when the date rolls over.
+    """
+    today = pd.Timestamp.today().normalize() if today is None else pd.Timestamp(today).normalize()
+    return ("interval_view", interval, pd.Timestamp(end_date), today)
+
+
+def interval_view(dataset, interval, end_date, today=None):
+    """KPI means for one of the INTERVALS buttons, ending at end_date, with Date as a column.
+
+    1W/1M are daily, 3M/6M the most recent 12/26 weeks, and 1Y/3Y the months within
+    one/three years of today.
+    """
+    key = view_key(interval, end_date, today)
+    _, _, end_date, today = key
+
+    def compute():
+        days_back, freq = INTERVALS[interval]
+        view = rollup.interval_view(rollups(dataset), end_date - pd.Timedelta(days=days_back), end_date, freq)
+        if interval in RECENT_WEEKS:
+            view = view.tail(RECENT_WEEKS[interval])
+        elif interval in RECENT_YEARS:
+            view = view[view["Date"] >= today - pd.DateOffset(years=RECENT_YEARS[interval])]
+        return view
+
+    return dataset.derived(key, compute)
+
+
+def distribution(dataset, interval, end_date, kpis, today=None):
+    """Histogram bin counts of the interval view for the given KPIs."""
+    key = view_key(interval, end_date, today)
+    return dataset.derived(
+        ("histogram", key, tuple(kpis)),
+        lambda: histogram_counts(interval_view(dataset, interval, end_date, key[3]), kpis),
+    )
+
+
+def fiscal_calendar(dataset, fy_start_month=fiscal.DEFAULT_FY_START_MONTH):
+    """Financial Year and Month labels of every day in the daily rollup."""
+    return dataset.derived(
+        ("fiscal_calendar", fy_start_month),
+        lambda: fiscal.fiscal_calendar(rollups(dataset)["D"].index, fy_start_month),
+    )
+
+
+def financial_years(dataset, fy_start_month=fiscal.DEFAULT_FY_START_MONTH):
+    """Financial years covered by the data, in chronological order."""
+    return list(fiscal_calendar(dataset, fy_start_month)["Financial Year"].cat.categories)
+
+
+def compare_ranges(dataset, kpi, ranges, fy_start_month=fiscal.DEFAULT_FY_START_MONTH):
+    """Monthly means of kpi per financial year for every (start, end) date range."""
+    ranges = tuple((pd.Timestamp(start), pd.Timestamp(end)) for start, end in ranges)
+    return dataset.derived(
+        ("compare_ranges", kpi, ranges, fy_start_month),
+        lambda: compare.compare_ranges(rollups(dataset), fiscal_calendar(dataset, fy_start_month), kpi, ranges),
+    )
+
+
+def compare_fiscal_years(dataset, kpi, fiscal_years, fy_start_month=fiscal.DEFAULT_FY_START_MONTH):
+    """Monthly means of kpi for each of the selected financial years."""
+    return dataset.derived(
+        ("compare_fiscal_years", kpi, tuple(fiscal_years), fy_start_month),
+        lambda: compare.compare_fiscal_years(rollups(dataset), fiscal_calendar(dataset, fy_start_month), kpi, fiscal_years),
+    )
+
+
+comparison_pivot = compare.comparison_pivot
@@ -0,0 +1,70 @@
+"""Serialisation of report frames to downloadable CSV, gzip-compressed CSV and XLSX."""
+import gzip
+import io
+import os
+
+# Export format -> (label, file extension, MIME type)
+EXPORT_FORMATS = {
+    "csv": ("CSV", ".csv", "text/csv"),
+    "csv.gz": ("CSV (gzip)", ".csv.gz", "application/gzip"),
+    "xlsx": ("Excel", ".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+# Rows serialised per step, bounding the uncompressed text held at any one time
+CHUNK_ROWS = 50_000
+
+# Exports up to this size (KPITRENDX_EXPORT_CACHE_MB) are kept for repeat downloads;
+# larger ones are rebuilt per click rather than holding a second copy of the view in memory
+EXPORT_CACHE_MAX_BYTES = int(float(os.environ.get("KPITRENDX_EXPORT_CACHE_MB", 16)) * 1024 * 1024)
+
+
+def _write_csv(df, stream):
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    df.to_csv(text, index=False, chunksize=CHUNK_ROWS)
+    text.flush()
+    text.detach()
+
+
+def _write_xlsx(df, stream, sheet_name="Report"):
+    import xlsxwriter
+
+    # constant_memory flushes each row to disk as soon as it is written
+    workbook = xlsxwriter.Workbook(stream, {
+        "constant_memory": True,
+        "default_date_format": "yyyy-mm-dd",
+        "nan_inf_to_errors": True,
+    })
+    worksheet = workbook.add_worksheet(sheet_name)
+    worksheet.write_row(0, 0, [str(col) for col in df.columns])
+    row = 1
+    for start in range(0, len(df), CHUNK_ROWS):
+        chunk = df.iloc[start:start + CHUNK_ROWS].astype(object)
+        chunk = chunk.where(chunk.notna(), None)
+        for values in chunk.itertuples(index=False, name=None):
+            worksheet.write_row(row, 0, values)
+            row += 1
+    workbook.close()
+
+
+def export_bytes(df, fmt):
+    """Serialises df in one of EXPORT_FORMATS."""
+    buffer = io.BytesIO()
+    if fmt == "csv":
+        _write_csv(df, buffer)
+    elif fmt == "csv.gz":
+        with gzip.GzipFile(fileobj=buffer, mode="wb") as compressed:
+            _write_csv(df, compressed)
+    elif fmt == "xlsx":
+        _write_xlsx(df, buffer)
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    return buffer.getvalue()
+
+
+def cached_export(dataset, view_key, df, fmt, max_cached_bytes=EXPORT_CACHE_MAX_BYTES):
+    """Returns a callable that builds the export on first request and caches it on the
+    dataset under view_key, for use as lazy download-button data.
+
+    view_key must identify everything df depends on (see engine.view_key).
+    """
+    return lambda: dataset.derived(("export", view_key, fmt), lambda: export_bytes(df, fmt), max_cached_bytes)
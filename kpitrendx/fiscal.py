@@ -0,0 +1,46 @@
+"""Vectorised fiscal-year and month labelling."""
+import numpy as np
+import pandas as pd
+
+MONTH_ABBR = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+# April, as used by Indian financial years
+DEFAULT_FY_START_MONTH = 4
+
+
+def month_order(fy_start_month=DEFAULT_FY_START_MONTH):
+    """Month abbreviations in fiscal order, e.g. Apr..Mar for an April start."""
+    return MONTH_ABBR[fy_start_month - 1:] + MONTH_ABBR[:fy_start_month - 1]
+
+
+def fiscal_year_label(fy_year, fy_start_month=DEFAULT_FY_START_MONTH):
+    """Label of the fiscal year starting in fy_year, e.g. FY2023-24."""
+    if fy_start_month == 1:
+        return f"FY{fy_year}"
+    return f"FY{fy_year}-{str(fy_year + 1)[-2:]}"
+
+
+def fiscal_calendar(dates, fy_start_month=DEFAULT_FY_START_MONTH):
+    """Financial Year, Fiscal Month (1-12) and Month label for every date.
+
+    Uses integer arithmetic on the year and month fields and formats one label per
+    distinct fiscal year, so the cost does not grow with a per-row Python call.
+    """
+    dates = pd.Series(dates)
+    year = dates.dt.year.to_numpy()
+    offset = dates.dt.month.to_numpy() - fy_start_month
+
+    # offset // 12 is -1 for months before the fiscal start and 0 otherwise
+    fy_year = year + offset // 12
+    fiscal_month = offset % 12 + 1
+
+    fy_years, fy_codes = np.unique(fy_year, return_inverse=True)
+    financial_year = pd.Categorical.from_codes(
+        fy_codes, categories=[fiscal_year_label(int(y), fy_start_month) for y in fy_years], ordered=True
+    )
+    month = pd.Categorical.from_codes(fiscal_month - 1, categories=month_order(fy_start_month), ordered=True)
+
+    return pd.DataFrame(
+        {"Financial Year": financial_year, "Fiscal Month": fiscal_month.astype(np.int8), "Month": month},
+        index=dates.index,
+    )
@@ -0,0 +1,9 @@
+"""Helpers for sorted datetime64 date columns and indexes."""
+import pandas as pd
+
+
+def date_bounds(dates, start, end):
+    """Positions [lo, hi) of the rows with start <= date <= end in a sorted date column."""
+    lo = dates.searchsorted(pd.Timestamp(start), side='left')
+    hi = dates.searchsorted(pd.Timestamp(end), side='right')
+    return int(lo), int(hi)
@@ -0,0 +1,50 @@
+"""Server-side histogram binning for the KPI distribution chart.
+
+Only bin edges and counts leave this module, so the chart payload depends on the
+number of bins rather than on the number of rows.
+"""
+import numpy as np
+import pandas as pd
+
+MAX_BINS = 60
+
+# KPIs share bin edges when each covers at least this fraction of the combined range
+SHARE_RATIO = 0.1
+
+
+def _bin_count(values):
+    if values.size < 2:
+        return 1
+    return int(min(MAX_BINS, max(1, len(np.histogram_bin_edges(values, bins="auto")) - 1)))
+
+
+def _shared_edges(values_by_kpi):
+    """Common bin edges for all KPIs, or None if their scales are too different."""
+    spans = {kpi: (values.min(), values.max()) for kpi, values in values_by_kpi.items() if values.size}
+    if len(spans) < 2:
+        return None
+    low = min(lo for lo, _ in spans.values())
+    high = max(hi for _, hi in spans.values())
+    if high <= low or any((hi - lo) < SHARE_RATIO * (high - low) for lo, hi in spans.values()):
+        return None
+    bins = max(_bin_count(values) for values in values_by_kpi.values())
+    return np.linspace(low, high, bins + 1)
+
+
+def histogram_counts(frame, kpis):
+    """Bin counts of every KPI as a long frame with KPI, Bin Start, Bin End and Count."""
+    values_by_kpi = {}
+    for kpi in kpis:
+        values = frame[kpi].to_numpy(dtype=np.float64, na_value=np.nan)
+        values_by_kpi[kpi] = values[np.isfinite(values)]
+
+    edges = _shared_edges(values_by_kpi)
+    parts = []
+    for kpi, values in values_by_kpi.items():
+        if not values.size:
+            continue
+        counts, kpi_edges = np.histogram(values, bins=edges if edges is not None else _bin_count(values))
+        parts.append(pd.DataFrame({"KPI": kpi, "Bin Start": kpi_edges[:-1], "Bin End": kpi_edges[1:], "Count": counts}))
+    if not parts:
+        return pd.DataFrame(columns=["KPI", "Bin Start", "Bin End", "Count"])
+    return pd.concat(parts, ignore_index=True)
@@ -0,0 +1,80 @@
+"""Parsing and normalisation of uploaded KPI files."""
+import io
+
+import pandas as pd
+
+from .cache import content_key, shared_cache
+from .compact import compact_frame
+from .dataset import Dataset
+from .registry import shared_registry
+from .store import shared_store
+
+SUPPORTED_FORMATS = ('csv', 'xlsx', 'xls', 'json')
+
+
+class LoadError(ValueError):
+    """Raised when an upload cannot be turned into a KPI frame."""
+
+
+def file_format(file_name):
+    return file_name.split('.')[-1].lower()
+
+
+def read_frame(data, file_extension):
+    """Parses raw upload bytes into a DataFrame according to the file format."""
+    buffer = io.BytesIO(data)
+    try:
+        if file_extension == 'csv':
+            return pd.read_csv(buffer)
+        elif file_extension in ['xlsx', 'xls']:
+            return pd.read_excel(buffer)
+        elif file_extension == 'json':
+            return pd.read_json(buffer)
+    except Exception as e:
+        raise LoadError(f"Error loading file: {e}") from e
+    raise LoadError("Unsupported file format. Please upload a CSV, Excel, or JSON file.")
+
+
+def normalise(df):
+    """Parses the Date column to day-resolution datetime64, drops rows without a valid
+    date and sorts the frame by Date. Raises LoadError if no row is left."""
+    if 'Date' not in df.columns:
+        raise LoadError("Dataset must contain a 'Date' column.")
+
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce').dt.normalize()
+    df.dropna(subset=['Date'], inplace=True)
+    if df.empty:
+        raise LoadError("No rows with a valid 'Date' were found in the file.")
+    # Keep Date as datetime64 sorted ascending so range filters can binary-search it
+    df.sort_values('Date', kind='stable', inplace=True, ignore_index=True)
+    return df
+
+
+def ingest(data, file_extension, key, store=shared_store, compact=False, name=None):
+    """Reopens the columnar copy of an upload, or parses it and writes one for next time."""
+    df = store.read(key)
+    if df is None:
+        df = normalise(read_frame(data, file_extension))
+        if compact:
+            df = compact_frame(df)
+        if name:
+            df.attrs["source"] = name
+        store.write(key, df)
+    return df
+
+
+def load_bytes(data, file_extension, cache=shared_cache, store=shared_store, compact=False, registry=shared_registry, name=None):
+    """Returns the Dataset for an upload, parsing it only if neither the dataset
+    registry nor the columnar store already holds it.
+
+    With compact, column dtypes are downcast at ingest (see compact.compact_frame).
+    The dataset is shared through the registry; sessions should work on a view of it
+    (see registry.SessionHandle). name is the upload's file name, shown when the
+    dataset is offered for reopening.
+    """
+    if file_extension not in SUPPORTED_FORMATS:
+        raise LoadError("Unsupported file format. Please upload a CSV, Excel, or JSON file.")
+
+    # A compacted frame differs from the plain one, so it is registered and stored separately
+    key = content_key(data, file_extension) + (":compact" if compact else "")
+    return registry.get_or_create(key, lambda: Dataset(key, ingest(data, file_extension, key, store, compact, name), cache))
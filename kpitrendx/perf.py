@@ -0,0 +1,139 @@
+"""Lightweight per-rerun timing of the dashboard pipeline stages.
+
+Each stage records wall time, rows in and out and, when memory tracking is on,
+the process-wide peak traced allocation while it ran. tracemalloc is global, so
+that peak includes whatever other sessions allocated at the same time. A finished
+trace is logged as one JSON line and, if KPITRENDX_PERF_LOG names a file, appended
+to it for offline analysis.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_log_lock = threading.Lock()
+
+# Owners (one token per session) that currently want memory tracing; a session
+# that goes away without opting out drops out of the set on its own
+_tracking_owners = weakref.WeakSet()
+_tracking_lock = threading.Lock()
+_started_tracing = False
+
+# Stages currently running in any session; the traced peak is only reset when none is
+_active_stages = 0
+
+
+class TrackingToken:
+    """Identifies one session's request for memory tracing; keep it in session state."""
+
+
+def set_memory_tracking(owner, enabled):
+    """Records whether owner wants tracemalloc on; tracing slows allocation-heavy code,
+    so it runs only while some owner asks for it (or always with KPITRENDX_TRACK_MEMORY=1).
+
+    Tracing started elsewhere is never stopped here.
+    """
+    global _started_tracing
+    with _tracking_lock:
+        if enabled:
+            _tracking_owners.add(owner)
+        else:
+            _tracking_owners.discard(owner)
+        wanted = len(_tracking_owners) > 0 or os.environ.get("KPITRENDX_TRACK_MEMORY", "0") not in ("", "0")
+        if wanted and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        elif not wanted and _started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+            _started_tracing = False
+
+
+class StageRecord:
+    def __init__(self, name, rows_in=None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.seconds = 0.0
+        self.process_peak_bytes = None
+
+    def as_dict(self):
+        return {
+            "stage": self.name,
+            "seconds": round(self.seconds, 6),
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "process_peak_bytes": self.process_peak_bytes,
+        }
+
+
+class PipelineTrace:
+    """Stage timings of one script run."""
+
+    def __init__(self, run_name="rerun"):
+        self.run_name = run_name
+        self.started_at = datetime.now(timezone.utc)
+        self.records = []
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """Times the enclosed block; set rows_out on the yielded record."""
+        global _active_stages
+        record = StageRecord(name, rows_in)
+        with _tracking_lock:
+            tracking = tracemalloc.is_tracing()
+            if tracking:
+                # Resetting while another session's stage runs would wipe its peak
+                if _active_stages == 0:
+                    tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+            _active_stages += 1
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = time.perf_counter() - start
+            with _tracking_lock:
+                _active_stages -= 1
+                if tracking and tracemalloc.is_tracing():
+                    record.process_peak_bytes = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+            self.records.append(record)
+
+    @property
+    def total_seconds(self):
+        return time.perf_counter() - self._start
+
+    def to_frame(self):
+        return pd.DataFrame([record.as_dict() for record in self.records],
+                            columns=["stage", "seconds", "rows_in", "rows_out", "process_peak_bytes"])
+
+    def to_dict(self):
+        return {
+            "run": self.run_name,
+            "started_at": self.started_at.isoformat(),
+            "total_seconds": round(self.total_seconds, 6),
+            "stages": [record.as_dict() for record in self.records],
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict())
+
+    def finish(self, log_path=None):
+        """Logs the trace as one JSON line and appends it to log_path (default
+        KPITRENDX_PERF_LOG) when set."""
+        line = self.to_json()
+        logger.info(line)
+        log_path = log_path or os.environ.get("KPITRENDX_PERF_LOG")
+        if log_path:
+            with _log_lock, open(log_path, "a", encoding="utf-8") as log_file:
+                log_file.write(line + "\n")
+        return line
@@ -0,0 +1,181 @@
+"""Process-wide registry holding one copy of every ingested dataset.
+
+Datasets are keyed by the content hash of their source, so sessions that upload
+the same file share a single frame and its rollups. Sessions hold datasets through
+a SessionHandle and get read-only views of them; a dataset stays resident while
+any handle holds it and is evicted once it has been idle for longer than idle_ttl,
+or earlier, least recently used first, when unheld datasets push the registry over
+its memory budget (KPITRENDX_CACHE_MB, like the shared cache).
+"""
+import os
+import threading
+import time
+import weakref
+
+from .cache import DEFAULT_BUDGET_MB
+
+# Minutes an unreferenced dataset is kept, overridable with KPITRENDX_IDLE_TTL_MIN
+DEFAULT_IDLE_TTL_MIN = 30
+
+
+class _Entry:
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.refs = 0
+        self.last_used = time.monotonic()
+
+
+class DatasetRegistry:
+    """Datasets by key, reference-counted by session handles, evicted when idle or
+    over max_bytes (0 means no limit)."""
+
+    def __init__(self, idle_ttl, max_bytes=0):
+        self.idle_ttl = idle_ttl
+        self.max_bytes = max_bytes
+        self._entries = {}
+        self._building = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get_or_create(self, key, build):
+        """Returns the registered dataset for key, building it on a miss.
+
+        Concurrent callers for the same key wait for a single build instead of each
+        ingesting their own copy.
+        """
+        dataset = self._touch(key)
+        if dataset is not None:
+            return dataset
+        with self._lock:
+            build_lock = self._building.setdefault(key, threading.Lock())
+        try:
+            with build_lock:
+                dataset = self._touch(key)
+                if dataset is None:
+                    dataset = build()
+                    with self._lock:
+                        self._entries[key] = _Entry(dataset)
+        finally:
+            with self._lock:
+                self._building.pop(key, None)
+        self.sweep()
+        return dataset
+
+    def acquire(self, dataset):
+        """Adds a reference to dataset, registering it again if it was evicted meanwhile."""
+        with self._lock:
+            entry = self._entries.get(dataset.key)
+            if entry is None:
+                entry = self._entries[dataset.key] = _Entry(dataset)
+            entry.refs += 1
+            entry.last_used = time.monotonic()
+
+    def release(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.refs = max(0, entry.refs - 1)
+                entry.last_used = time.monotonic()
+        self.sweep()
+
+    def sweep(self, now=None):
+        """Evicts datasets no session holds that have been idle for longer than idle_ttl,
+        then unheld ones, least recently used first, until the registry fits in max_bytes.
+        Datasets in use are never evicted. Returns the evicted keys."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            unheld = sorted((entry.last_used, key) for key, entry in self._entries.items() if entry.refs == 0)
+            evicted = [key for last_used, key in unheld if now - last_used > self.idle_ttl]
+            if self.max_bytes:
+                total = sum(entry.dataset.nbytes for entry in self._entries.values())
+                total -= sum(self._entries[key].dataset.nbytes for key in evicted)
+                for _, key in unheld:
+                    if total <= self.max_bytes:
+                        break
+                    if key not in evicted:
+                        evicted.append(key)
+                        total -= self._entries[key].dataset.nbytes
+            for key in evicted:
+                del self._entries[key]
+        return evicted
+
+    def datasets(self):
+        """Registered datasets, most recently used first."""
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda entry: entry.last_used, reverse=True)
+        return [entry.dataset for entry in entries]
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "datasets": len(self._entries),
+                "in_use": sum(entry.refs > 0 for entry in self._entries.values()),
+                "references": sum(entry.refs for entry in self._entries.values()),
+                "bytes": sum(entry.dataset.nbytes for entry in self._entries.values()),
+                "max_bytes": self.max_bytes,
+            }
+
+    def _touch(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry.last_used = time.monotonic()
+            return entry.dataset
+
+
+class SessionHandle:
+    """One session's hold on the registry: the dataset it currently works on.
+
+    Keep the handle in per-session state; when the session and its handle are
+    garbage collected, every dataset it still holds is released.
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+        # The finalizer gets the list, not self, so it does not keep the handle alive
+        self._keys = []
+        self._finalizer = weakref.finalize(self, _release_all, registry, self._keys)
+
+    @property
+    def key(self):
+        return self._keys[0] if self._keys else None
+
+    def hold(self, dataset):
+        """Makes dataset the one this session holds, releasing the previous one, and
+        returns a read-only view of it."""
+        if dataset.key != self.key:
+            self.registry.acquire(dataset)
+            _release_all(self.registry, self._keys)
+            self._keys.append(dataset.key)
+        return dataset.view()
+
+    def release(self):
+        """Drops the held dataset, e.g. when the session clears its upload."""
+        _release_all(self.registry, self._keys)
+
+
+def _release_all(registry, keys):
+    while keys:
+        registry.release(keys.pop())
+
+
+shared_registry = DatasetRegistry(
+    float(os.environ.get("KPITRENDX_IDLE_TTL_MIN", DEFAULT_IDLE_TTL_MIN)) * 60,
+    int(float(os.environ.get("KPITRENDX_CACHE_MB", DEFAULT_BUDGET_MB)) * 1024 * 1024),
+)
@@ -0,0 +1,123 @@
+"""Pre-aggregated day/week/month rollups of every numeric KPI.
+
+Each rollup table is indexed by period (labelled with its last day, like
+resample('W') and resample('M')) and has two column groups, "sum" and "count",
+holding the per-KPI sum and non-null row count (streamed datasets also carry
+"min" and "max"). Sums and counts add up across
+periods, so any coarser view is a regroup of a finer one and means stay
+weighted by rows rather than by days.
+"""
+import pandas as pd
+
+from .frames import date_bounds
+
+FREQUENCIES = ("D", "W", "M")
+
+
+def period_end(dates, freq):
+    """Label of the week ('W', ending Sunday) or month ('M') containing each date."""
+    return pd.DatetimeIndex(dates).to_period(freq).end_time.normalize()
+
+
+# How each statistic combines when rows of a rollup are merged
+STAT_AGGREGATIONS = {"sum": "sum", "count": "sum", "min": "min", "max": "max"}
+
+
+def daily_rollup(df, kpis, extremes=False):
+    """Per-day sum and non-null count of each KPI, plus min and max with extremes."""
+    # Sum in float64 so that compact float32/integer columns do not lose precision
+    grouped = df[kpis].astype("float64").groupby(df["Date"].to_numpy())
+    stats = ["sum", "count", "min", "max"] if extremes else ["sum", "count"]
+    rollup = pd.concat({stat: getattr(grouped, stat)() for stat in stats}, axis=1)
+    rollup.index = pd.DatetimeIndex(rollup.index, name="Date")
+    return rollup
+
+
+def combine(rollup, labels):
+    """Merges the rows of a rollup that share a label, statistic by statistic."""
+    stats = rollup.columns.get_level_values(0).unique()
+    return pd.concat(
+        {stat: getattr(rollup[stat].groupby(labels), STAT_AGGREGATIONS[stat])() for stat in stats}, axis=1
+    )
+
+
+def regroup(rollup, freq, fill_gaps=False):
+    """Aggregates a finer rollup into weeks or months.
+
+    With fill_gaps, periods without any rows are kept as zero-count rows, which
+    show up as gaps in the means the same way resample() would produce them.
+    """
+    if freq == "D":
+        return rollup
+    coarse = combine(rollup, period_end(rollup.index, freq))
+    if fill_gaps and not coarse.empty:
+        periods = pd.period_range(rollup.index[0], rollup.index[-1], freq=freq)
+        coarse = coarse.reindex(periods.end_time.normalize())
+        additive = coarse.columns.get_level_values(0).isin(["sum", "count"])
+        coarse.loc[:, additive] = coarse.loc[:, additive].fillna(0)
+    coarse.index.name = "Date"
+    return coarse
+
+
+def rollups_from_daily(daily):
+    """Day, week and month rollups derived from a daily rollup."""
+    return {"D": daily, "W": regroup(daily, "W"), "M": regroup(daily, "M")}
+
+
+def build_rollups(df, kpis):
+    """Day, week and month rollups of the given KPI columns."""
+    return rollups_from_daily(daily_rollup(df, kpis))
+
+
+def merge_daily(daily, delta):
+    """Adds the daily rollup of new rows to an existing one, combining days present in both."""
+    if delta.empty:
+        return daily
+    if daily.empty or delta.index[0] > daily.index[-1]:
+        # The usual append: every new day comes after the last known one
+        return pd.concat([daily, delta])
+    merged = pd.concat([daily, delta]).sort_index(kind="stable")
+    return combine(merged, merged.index)
+
+
+def update_rollups(rollups, delta):
+    """Folds the daily rollup of new rows into day, week and month rollups.
+
+    Only the weeks and months containing a new day are regrouped; every other
+    period row is carried over unchanged.
+    """
+    daily = merge_daily(rollups["D"], delta)
+    updated = {"D": daily}
+    for freq in ("W", "M"):
+        affected = period_end(delta.index, freq).unique()
+        if affected.empty:
+            updated[freq] = rollups[freq]
+            continue
+        # Days of the affected periods, which all fall on or after the first one's start
+        window = daily.loc[affected[0].to_period(freq).start_time:]
+        labels = period_end(window.index, freq)
+        in_affected = labels.isin(affected)
+        fresh = combine(window[in_affected], labels[in_affected])
+        fresh.index.name = "Date"
+        kept = rollups[freq].drop(affected, errors="ignore")
+        updated[freq] = pd.concat([kept, fresh]).sort_index(kind="stable")
+    return updated
+
+
+def means(rollup):
+    """Row-weighted KPI means of a rollup table (NaN for periods without values)."""
+    totals = rollup["sum"]
+    counts = rollup["count"]
+    return totals.div(counts.where(counts > 0))
+
+
+def interval_view(rollups, start_date, end_date, freq):
+    """KPI means per day, week or month over start_date..end_date, with Date as a column.
+
+    Only the daily rollup rows inside the window are touched, so the cost depends
+    on the number of days in the window, not on the number of raw rows.
+    """
+    daily = rollups["D"]
+    lo, hi = date_bounds(daily.index, start_date, end_date)
+    window = regroup(daily.iloc[lo:hi], freq, fill_gaps=True)
+    return means(window).reset_index()
@@ -0,0 +1,206 @@
+"""On-disk columnar store: each ingested upload is kept as an uncompressed Arrow IPC file.
+
+Arrow IPC files are memory-mapped on reload, so re-opening a dataset skips parsing
+entirely and the OS page cache shares the pages between worker processes.
+
+The directory (KPITRENDX_DATA_DIR, empty to disable the store) is kept under a
+disk budget (KPITRENDX_DATA_DIR_MB) by deleting the least recently used files
+after each write. To empty it by hand:
+
+    python -m kpitrendx.store --clear
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import tempfile
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:  # pragma: no cover - pyarrow ships with streamlit
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_DIR = os.path.join(os.path.expanduser("~"), ".kpitrendx", "datasets")
+
+# Disk budget of the store in MB; 0 means unlimited
+DEFAULT_BUDGET_MB = 2048
+
+
+class ColumnarStore:
+    """Content-addressed directory of Arrow IPC files, one per dataset key."""
+
+    # Bump when the normalised frame layout changes so stale files are never reused
+    schema_version = 2
+
+    def __init__(self, root, max_bytes=0):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    @property
+    def enabled(self):
+        return pa is not None and bool(self.root)
+
+    def path(self, key):
+        # Keys look like "csv:<digest>"; ':' is not allowed in Windows file names
+        file_name = f"{key.replace(':', '_')}.v{self.schema_version}.arrow"
+        return os.path.join(self.root, file_name)
+
+    def __contains__(self, key):
+        return self.enabled and os.path.exists(self.path(key))
+
+    def read(self, key):
+        """Memory-maps the stored dataset for key, or returns None if it is not stored."""
+        if key not in self:
+            return None
+        path = self.path(key)
+        try:
+            # The modification time doubles as the last-used time for pruning
+            os.utime(path)
+            table = feather.read_table(path, memory_map=True)
+            # split_blocks lets null-free numeric columns stay zero-copy views of the mapping
+            return table.to_pandas(split_blocks=True)
+        except Exception as e:
+            logger.warning("Discarding unreadable dataset %s: %s", path, e)
+            self.discard(key)
+            return None
+
+    def write(self, key, df):
+        """Writes df for key atomically; returns False if the frame cannot be stored."""
+        if not self.enabled:
+            return False
+        path = self.path(key)
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            os.close(fd)
+            try:
+                # Memory mapping requires the file to be written uncompressed
+                feather.write_feather(table, tmp_path, compression="uncompressed")
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        except Exception as e:
+            logger.warning("Could not store dataset %s: %s", key, e)
+            return False
+        self.prune(keep=path)
+        return True
+
+    def demote(self, key):
+        """Marks the file of key least recently used, so pruning deletes it first
+        while it stays readable until the store is over budget."""
+        try:
+            os.utime(self.path(key), (0, 0))
+        except OSError:
+            pass
+
+    def discard(self, key):
+        try:
+            os.remove(self.path(key))
+        except OSError:
+            pass
+
+    def files(self):
+        """(path, size, last used) of every stored file, least recently used first."""
+        entries = []
+        for path in glob.glob(os.path.join(self.root, "*.arrow")):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def nbytes(self):
+        return sum(size for _, size, _ in self.files())
+
+    def catalog(self):
+        """(key, source name) of every stored dataset, most recently used first."""
+        if not self.enabled:
+            return []
+        suffix = f".v{self.schema_version}.arrow"
+        entries = []
+        for path, _, _ in reversed(self.files()):
+            if path.endswith(suffix):
+                # Inverts path(): keys never contain '_' themselves
+                key = os.path.basename(path)[:-len(suffix)].replace("_", ":")
+                entries.append((key, self._source_name(path) or key))
+        return entries
+
+    def _source_name(self, path):
+        # frame.attrs travel in the pandas schema metadata, readable without loading any column
+        try:
+            with pa.memory_map(path) as source:
+                metadata = pa.ipc.open_file(source).schema.metadata or {}
+            return json.loads(metadata.get(b"pandas", b"{}")).get("attributes", {}).get("source")
+        except Exception:
+            return None
+
+    def prune(self, max_bytes=None, keep=None):
+        """Deletes files of older schema versions, then least recently used files until
+        the store fits in max_bytes (default self.max_bytes; 0 means no limit).
+        Returns the deleted paths."""
+        if not self.root or not os.path.isdir(self.root):
+            return []
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        suffix = f".v{self.schema_version}.arrow"
+        entries = self.files()
+        doomed = [path for path, _, _ in entries if not path.endswith(suffix)]
+        current = [entry for entry in entries if entry[0].endswith(suffix)]
+        total = sum(size for _, size, _ in current)
+        for path, size, _ in current:
+            if not max_bytes or total <= max_bytes:
+                break
+            if path != keep:
+                doomed.append(path)
+                total -= size
+        return self._remove(doomed)
+
+    def clear(self):
+        """Deletes every stored file; returns the deleted paths."""
+        return self._remove([path for path, _, _ in self.files()])
+
+    def _remove(self, paths):
+        deleted = []
+        for path in paths:
+            try:
+                # May fail on Windows while another process still has the file mapped
+                os.remove(path)
+                deleted.append(path)
+            except OSError:
+                pass
+        return deleted
+
+
+shared_store = ColumnarStore(
+    os.environ.get("KPITRENDX_DATA_DIR", DEFAULT_DATA_DIR),
+    int(float(os.environ.get("KPITRENDX_DATA_DIR_MB", DEFAULT_BUDGET_MB)) * 1024 * 1024),
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or clean up the KPITrendX dataset store.")
+    parser.add_argument("--root", default=shared_store.root, help="store directory (default: %(default)s)")
+    parser.add_argument("--clear", action="store_true", help="delete every stored dataset")
+    parser.add_argument("--max-mb", type=float, help="prune least recently used files down to this size")
+    args = parser.parse_args(argv)
+
+    store = ColumnarStore(args.root)
+    if args.clear:
+        deleted = store.clear()
+    elif args.max_mb is not None:
+        deleted = store.prune(max_bytes=int(args.max_mb * 1024 * 1024))
+    else:
+        deleted = []
+    print(f"{store.root}: deleted {len(deleted)} files, {len(store.files())} left ({store.nbytes() / 1e6:,.1f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""Streaming ingest for uploads that are too large to parse into one frame.
+
+The file is read in chunks; each chunk is folded into daily KPI aggregates
+(sum/count/min/max) and into a bounded uniform sample of raw rows, so peak
+memory is set by the chunk size rather than by the file size.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .cache import file_content_key, shared_cache
+from .dataset import Dataset
+from .registry import shared_registry
+from .loader import LoadError
+from .rollup import combine, daily_rollup, rollups_from_daily
+
+STREAMING_FORMATS = ('csv', 'json')
+
+DEFAULT_CHUNK_ROWS = 200_000
+DEFAULT_SAMPLE_ROWS = 10_000
+
+# Uploads at least this large default to streaming mode in the app; Streamlit's
+# server.maxUploadSize (see .streamlit/config.toml) must be above it to matter
+STREAM_THRESHOLD_BYTES = int(float(os.environ.get("KPITRENDX_STREAM_THRESHOLD_MB", 200)) * 1024 * 1024)
+
+# Bytes inspected to tell line-delimited JSON from a JSON document
+SNIFF_BYTES = 64 * 1024
+
+
+def can_stream(file, file_extension):
+    """True for CSV and for JSON whose first line is a complete flat JSON object, i.e.
+    line-delimited records; a records array or other JSON document cannot be streamed."""
+    if file_extension == 'csv':
+        return True
+    if file_extension != 'json':
+        return False
+    file.seek(0)
+    head = file.read(SNIFF_BYTES)
+    file.seek(0)
+    first_line = head.lstrip().split(b"\n", 1)[0]
+    try:
+        record = json.loads(first_line)
+    except ValueError:
+        return False
+    # A one-line document oriented by column holds nested objects, a record does not
+    return isinstance(record, dict) and not any(isinstance(v, (dict, list)) for v in record.values())
+
+
+def iter_chunks(source, file_extension, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yields DataFrame chunks of a CSV or line-delimited JSON file."""
+    try:
+        if file_extension == 'csv':
+            yield from pd.read_csv(source, chunksize=chunk_rows)
+        elif file_extension == 'json':
+            yield from pd.read_json(source, lines=True, chunksize=chunk_rows)
+        else:
+            raise LoadError("Streaming ingest supports CSV and line-delimited JSON files only.")
+    except LoadError:
+        raise
+    except Exception as e:
+        raise LoadError(f"Error loading file: {e}") from e
+
+
+class StreamAggregator:
+    """Folds chunks into daily aggregates and a reservoir sample of raw rows.
+
+    KPI columns are fixed by the first chunk: its numeric columns other than Date.
+    Later chunks are coerced to numbers so that one stray value cannot change them.
+    """
+
+    def __init__(self, sample_rows=DEFAULT_SAMPLE_ROWS, seed=0):
+        self.sample_rows = sample_rows
+        self.kpis = None
+        self.rows = 0
+        self.daily = None
+        self._sample = None
+        self._rng = np.random.default_rng(seed)
+
+    def add(self, chunk):
+        if 'Date' not in chunk.columns:
+            raise LoadError("Dataset must contain a 'Date' column.")
+        if self.kpis is None:
+            self.kpis = [col for col in chunk.columns if col != "Date" and pd.api.types.is_numeric_dtype(chunk[col])]
+        for kpi in self.kpis:
+            if not pd.api.types.is_numeric_dtype(chunk[kpi]):
+                chunk[kpi] = pd.to_numeric(chunk[kpi], errors='coerce')
+
+        chunk['Date'] = pd.to_datetime(chunk['Date'], errors='coerce').dt.normalize()
+        chunk = chunk.dropna(subset=['Date'])
+        self.rows += len(chunk)
+
+        chunk_daily = daily_rollup(chunk, self.kpis, extremes=True)
+        if self.daily is not None:
+            merged = pd.concat([self.daily, chunk_daily])
+            chunk_daily = combine(merged, merged.index)
+        self.daily = chunk_daily
+        self._add_to_sample(chunk)
+
+    def _add_to_sample(self, chunk):
+        # Keeping the rows with the smallest random keys yields a uniform sample
+        keyed = chunk.assign(_key=self._rng.random(len(chunk)))
+        if self._sample is not None:
+            keyed = pd.concat([self._sample, keyed], ignore_index=True)
+        self._sample = keyed.nsmallest(self.sample_rows, "_key")
+
+    @property
+    def sample(self):
+        """The raw-row sample, sorted by Date like a normalised frame."""
+        if self._sample is None:
+            return pd.DataFrame(columns=["Date"])
+        sample = self._sample.drop(columns="_key")
+        return sample.sort_values('Date', kind='stable', ignore_index=True)
+
+
+def stream_aggregate(source, file_extension, chunk_rows=DEFAULT_CHUNK_ROWS, sample_rows=DEFAULT_SAMPLE_ROWS):
+    """Aggregates a file chunk by chunk; returns (rollups, sample, row count)."""
+    aggregator = StreamAggregator(sample_rows)
+    for chunk in iter_chunks(source, file_extension, chunk_rows):
+        aggregator.add(chunk)
+    if aggregator.daily is None or aggregator.daily.empty:
+        raise LoadError("No rows with a valid 'Date' were found in the file.")
+    return rollups_from_daily(aggregator.daily), aggregator.sample, aggregator.rows
+
+
+def load_stream(file, file_extension, cache=shared_cache, chunk_rows=DEFAULT_CHUNK_ROWS, sample_rows=DEFAULT_SAMPLE_ROWS,
+                registry=shared_registry):
+    """Returns a Dataset whose rollups cover every row of the file and whose frame is
+    a bounded sample, streaming the file only on a cache miss."""
+    if file_extension not in STREAMING_FORMATS:
+        raise LoadError("Streaming ingest supports CSV and line-delimited JSON files only.")
+
+    key = file_content_key(file, file_extension) + ":stream"
+
+    def ingest():
+        rollups, sample, rows = stream_aggregate(file, file_extension, chunk_rows, sample_rows)
+        name = os.path.basename(getattr(file, "name", "") or "") or None
+        return Dataset(key, sample, cache, pinned={"rollups": rollups}, source_rows=rows, name=name)
+
+    return registry.get_or_create(key, ingest)
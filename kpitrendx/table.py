@@ -0,0 +1,39 @@
+"""Server-side paging of report tables, so only the visible rows reach the browser."""
+import numpy as np
+
+PAGE_SIZES = (25, 50, 100, 500)
+DEFAULT_PAGE_SIZE = 50
+
+
+def page_count(total_rows, page_size):
+    """Number of pages needed for total_rows, at least one."""
+    return max(1, -(-total_rows // page_size))
+
+
+def sort_order(df, sort_by, ascending=True):
+    """Row positions of df sorted by one column, stable and with missing values last."""
+    ordered = df[sort_by].reset_index(drop=True).sort_values(ascending=ascending, kind="stable", na_position="last")
+    return ordered.index.to_numpy()
+
+
+def paginate(df, page, page_size=DEFAULT_PAGE_SIZE, sort_by=None, ascending=True, columns=None, order=None):
+    """Returns (rows of the 1-based page, total rows, number of pages).
+
+    Only the page's rows and the selected columns are copied. order is a
+    precomputed sort_order(df, sort_by, ascending), letting callers cache it
+    across page turns under the same key as df itself.
+    """
+    total = len(df)
+    pages = page_count(total, page_size)
+    page = min(max(1, int(page)), pages)
+    start = (page - 1) * page_size
+    positions = np.arange(start, min(start + page_size, total))
+    if sort_by is not None:
+        # An order cached for another version of the frame would point at the wrong rows
+        if order is None or len(order) != total:
+            order = sort_order(df, sort_by, ascending)
+        positions = order[positions]
+    view = df.iloc[positions]
+    if columns is not None:
+        view = view[list(columns)]
+    return view, total, pages
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from kpitrendx.compare import compare_fiscal_years, compare_ranges, comparison_pivot
+from kpitrendx.fiscal import fiscal_calendar, month_order
+from kpitrendx.rollup import build_rollups
+
+
+def _rollups_and_calendar(fy_start_month):
+    dates = pd.date_range("2021-01-01", "2022-12-31", freq="D")
+    df = pd.DataFrame({"Date": dates, "Sales": np.arange(len(dates), dtype="float64")})
+    rollups = build_rollups(df, ["Sales"])
+    return rollups, fiscal_calendar(rollups["D"].index, fy_start_month)
+
+
+def test_fiscal_year_comparison_keeps_fiscal_month_order():
+    rollups, calendar = _rollups_and_calendar(4)
+    final_df = compare_fiscal_years(rollups, calendar, "Sales", ["FY2021-22"])
+
+    assert list(final_df["Month"]) == month_order(4)
+    assert list(comparison_pivot(final_df, "Sales")["Month"]) == month_order(4)
+
+
+def test_range_comparison_keeps_fiscal_month_order():
+    rollups, calendar = _rollups_and_calendar(7)
+    final_df = compare_ranges(rollups, calendar, "Sales", [("2021-07-01", "2022-06-30")])
+
+    assert list(final_df["Month"]) == month_order(7)
+    assert list(comparison_pivot(final_df, "Sales")["Month"]) == month_order(7)
+
+
+def test_pivot_of_overlapping_ranges_keeps_a_column_per_range():
+    rollups, calendar = _rollups_and_calendar(4)
+    final_df = compare_ranges(rollups, calendar, "Sales", [("2021-01-01", "2022-12-31"), ("2021-01-01", "2022-12-31")])
+    pivot = comparison_pivot(final_df, "Sales")
+
+    assert list(pivot["Month"]) == month_order(4)
+    assert len(pivot.columns) == 1 + 2 * final_df["Financial Year"].nunique()
+    first, second = (column for column in pivot.columns if column.startswith("FY2021-22"))
+    assert pivot[first].equals(pivot[second])
@@ -0,0 +1,28 @@
+import pandas as pd
+
+from kpitrendx.dataset import Dataset
+from kpitrendx.registry import DatasetRegistry, SessionHandle
+
+
+def _dataset(key, rows=1000):
+    return Dataset(key, pd.DataFrame({"Date": pd.date_range("2024-01-01", periods=rows), "Sales": 1.0}))
+
+
+def test_unheld_datasets_are_evicted_least_recently_used_first_when_over_budget():
+    size = _dataset("probe").nbytes
+    registry = DatasetRegistry(idle_ttl=3600, max_bytes=int(3.5 * size))
+    handle = SessionHandle(registry)
+
+    held = handle.hold(registry.get_or_create("held", lambda: _dataset("held")))
+    registry.get_or_create("old", lambda: _dataset("old"))
+    registry.get_or_create("new", lambda: _dataset("new"))
+    assert "old" in registry
+
+    registry.get_or_create("newest", lambda: _dataset("newest"))
+
+    # The held dataset stays even though it is the least recently used one
+    assert held.key in registry
+    assert "old" not in registry
+    assert "new" in registry
+    assert "newest" in registry
+    assert registry.stats()["bytes"] <= registry.max_bytes
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from kpitrendx.append import merge_frames
+from kpitrendx.rollup import daily_rollup, rollups_from_daily, update_rollups
+
+
+def _frame(dates, seed):
+    rng = np.random.default_rng(seed)
+    values = rng.integers(0, 100, size=len(dates)).astype("float64")
+    values[::7] = np.nan
+    return pd.DataFrame({"Date": pd.DatetimeIndex(dates), "Sales": values, "Units": rng.integers(0, 10, size=len(dates))})
+
+
+@pytest.mark.parametrize("extremes", [False, True])
+def test_incremental_rollups_match_a_rebuild_of_the_merged_frame(extremes):
+    days = pd.date_range("2024-01-01", "2024-03-31", freq="D")
+    base = _frame(days.drop(pd.Timestamp("2024-02-10")).repeat(2), seed=0)
+    # An out-of-order day filling a gap, an existing month end, and days running past
+    # the last known one into a week and a month that straddle the old end
+    delta = _frame(pd.to_datetime(["2024-02-10", "2024-01-31", "2024-03-30", "2024-03-31", "2024-04-01", "2024-04-03"]), seed=1)
+
+    kpis = ["Sales", "Units"]
+    rollups = rollups_from_daily(daily_rollup(base, kpis, extremes=extremes))
+    updated = update_rollups(rollups, daily_rollup(delta, kpis, extremes=extremes))
+    rebuilt = rollups_from_daily(daily_rollup(merge_frames(base, delta), kpis, extremes=extremes))
+
+    for freq in ("D", "W", "M"):
+        pd.testing.assert_frame_equal(updated[freq], rebuilt[freq], check_freq=False)